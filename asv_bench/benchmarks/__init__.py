@@ -0,0 +1 @@
+"""Benchmarks for kodiak, run them with asv from the ``asv_bench`` folder"""
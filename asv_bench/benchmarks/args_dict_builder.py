@@ -0,0 +1,27 @@
+from itertools import product
+
+from kodiak.args_dict_builder import ArgsDictBuilder
+from kodiak.args_parser import ArgsParser
+from kodiak.transforms import default_transform
+
+
+class Build(object):
+    params = ([10, 100, 1000], ['zip', 'product'])
+    param_names = ['nargs', 'combiner']
+
+    def setup(self, nargs, combiner):
+        if combiner == 'zip':
+            self.builder = ArgsDictBuilder(ArgsParser(), default_transform, zip)
+            self.template = "col_{0:%d}_{.a%s}" % (
+                nargs - 1, "".join(",.a%d" % i for i in range(nargs - 1)))
+        else:
+            # two groups of sqrt(nargs) arguments expand to nargs columns
+            side = int(nargs ** 0.5)
+            self.builder = ArgsDictBuilder(ArgsParser(), default_transform, product)
+            self.template = "col_{0:%d}_{1:%d}" % (side - 1, side)
+
+    def time_build(self, nargs, combiner):
+        self.builder.build(self.template)
+
+    def peakmem_build(self, nargs, combiner):
+        self.builder.build(self.template)
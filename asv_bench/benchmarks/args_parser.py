@@ -0,0 +1,30 @@
+from kodiak.args_parser import ArgsParser
+
+
+def template(nargs):
+    """A template with ``nargs`` arguments split between a list, a range and
+    key-values
+    """
+    third = max(nargs // 3, 1)
+    names = ",".join("a%d" % i for i in range(third))
+    pairs = ",".join("k%d=v%d" % (i, i) for i in range(third))
+    return "col_{%s,0:%d,%s}" % (names, third - 1, pairs)
+
+
+class Parse(object):
+    params = [1, 100, 10000]
+    param_names = ['nargs']
+
+    def setup(self, nargs):
+        self.parser = ArgsParser()
+        self.template = template(nargs)
+        self.groups = "_".join("{a,b,c}" for _ in range(max(nargs // 3, 1)))
+
+    def time_parse(self, nargs):
+        self.parser.parse(self.template)
+
+    def time_parse_groups(self, nargs):
+        self.parser.parse(self.groups)
+
+    def peakmem_parse(self, nargs):
+        self.parser.parse(self.template)
@@ -0,0 +1,110 @@
+"""`gencol` and `mutcol` against the plain pandas code they replace, the
+``pandas`` benchmarks are the baseline that shows the overhead of kodiak
+"""
+import numpy as np
+import pandas as pd
+
+from kodiak.colbuilders import splitter
+from kodiak.kodiak_dataframe import KodiakDataFrame
+
+NAMES = np.array(['Groucho Marx', 'Harpo Marx', 'Chico Marx', 'Zeppo Marx'])
+
+
+def make_frame(nrows):
+    return KodiakDataFrame({
+        'born': pd.date_range('1890-01-01', periods=nrows, freq='min'),
+        'name': NAMES[np.arange(nrows) % len(NAMES)],
+        'amount': np.arange(nrows, dtype='float64')})
+
+
+class GenCol(object):
+    params = ([10 ** 3, 10 ** 5, 10 ** 7],
+              ['attribute', 'method', 'splitter', 'custom'])
+    param_names = ['nrows', 'builder']
+
+    def setup(self, nrows, builder):
+        self.df = make_frame(nrows)
+
+    def time_gencol(self, nrows, builder):
+        df = self.df.copy()
+        if builder == 'attribute':
+            df.gencol("born_{.month,.day,.year}", "born")
+        elif builder == 'method':
+            df.gencol("born_{isoweekday!,day_name!}", "born")
+        elif builder == 'splitter':
+            df.gencol("{first,last}_name", "name", splitter(" "))
+        else:
+            df.gencol("amount_{1:3}", "amount", lambda x, y: x * y)
+
+    def time_pandas(self, nrows, builder):
+        df = self.df.copy()
+        if builder == 'attribute':
+            for y in ['month', 'day', 'year']:
+                df["born_" + y] = df.born.map(lambda x: getattr(x, y))
+        elif builder == 'method':
+            for y in ['isoweekday', 'day_name']:
+                df["born_" + y] = df.born.map(lambda x: getattr(x, y)())
+        elif builder == 'splitter':
+            for i, y in enumerate(['first', 'last']):
+                df[y + "_name"] = df.name.map(lambda x: x.split(" ")[i])
+        else:
+            for y in [1, 2, 3]:
+                df["amount_%d" % y] = df.amount.map(lambda x: x * y)
+
+
+class MutCol(object):
+    params = [10 ** 3, 10 ** 5, 10 ** 7]
+    param_names = ['nrows']
+
+    def setup(self, nrows):
+        self.df = make_frame(nrows)
+
+    def time_mutcol(self, nrows):
+        self.df.copy().mutcol("name", lambda x, y: x.lower())
+
+    def time_pandas(self, nrows):
+        df = self.df.copy()
+        df["name"] = df.name.map(lambda x: x.lower())
+
+
+class WideGenCol(object):
+    params = [10, 100, 300]
+    param_names = ['ncols']
+
+    def setup(self, ncols):
+        self.df = make_frame(10 ** 4)
+        self.template = "amount_{1:%d}" % ncols
+
+    def time_gencol(self, ncols):
+        self.df.copy().gencol(self.template, "amount", lambda x, y: x * y)
+
+    def time_pandas(self, ncols):
+        df = self.df.copy()
+        for y in range(1, ncols + 1):
+            df["amount_%d" % y] = df.amount.map(lambda x: x * y)
+
+
+class WideFrame(object):
+    """One column generated or mutated on a frame with many columns, the
+    cost of attaching it should not grow with the width of the frame"""
+    params = [10, 200]
+    param_names = ['ncols']
+
+    def setup(self, ncols):
+        self.df = KodiakDataFrame(
+            np.random.rand(2 * 10 ** 5, ncols),
+            columns=['c%d' % i for i in range(ncols)])
+
+    def time_gencol(self, ncols):
+        self.df.copy().gencol("c0_{2}", "c0", lambda x, y: x * 2)
+
+    def time_mutcol(self, ncols):
+        self.df.copy().mutcol("c0", lambda x, y: x * 2)
+
+    def time_pandas_gencol(self, ncols):
+        df = self.df.copy()
+        df["c0_2"] = df.c0.map(lambda x: x * 2)
+
+    def time_pandas_mutcol(self, ncols):
+        df = self.df.copy()
+        df["c0"] = df.c0.map(lambda x: x * 2)
@@ -0,0 +1,20 @@
+from kodiak.args_parser import Match, MatchGroup
+from kodiak.transforms import default_transform
+
+
+class ComposerTransform(object):
+    params = (['plain', 'number', 'attribute', 'method'], [100, 10000])
+    param_names = ['value', 'nargs']
+
+    def setup(self, value, nargs):
+        values = {'plain': 'foo%d', 'number': '%d', 'attribute': '.foo%d',
+                  'method': 'foo%d!'}
+        self.matches = [Match(values[value] % i) for i in range(nargs)]
+        self.group = MatchGroup([match.original for match in self.matches])
+
+    def time_transform(self, value, nargs):
+        for match in self.matches:
+            default_transform.transform(Match(match.original))
+
+    def time_transform_group(self, value, nargs):
+        default_transform.transform_group(self.group)
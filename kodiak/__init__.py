@@ -5,6 +5,10 @@
 from __future__ import absolute_import
 
 from kodiak.kodiak_dataframe import KodiakDataFrame
+from kodiak.instrumentation import (ColumnStats, LoggingSink, StatsCollector,
+                                    instrument)
+from kodiak.plan import GencolPlan, compile
+from kodiak.streaming import Stream, stream
 from kodiak.config import *
 
 __author__ = """Ezequiel Erbaro"""
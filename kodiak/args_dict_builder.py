@@ -1,12 +1,148 @@
 from __future__ import absolute_import
 
+import re
 from collections import OrderedDict
+from functools import reduce
+from itertools import product
+from operator import mul
 
-from kodiak.config import options
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+from kodiak.args_parser import MatchGroup
+from kodiak.config import current_config
+
+
+def _label(match):
+    return match.label or match.value
+
+
+class ArgsPlan(Mapping):
+    """The new column names and their arguments, combined lazily
+
+    Iterating yields the names, `items` yields ``(name, args)`` pairs and
+    names are looked up without combining all the groups, so templates with
+    millions of combinations don't need to be materialized.
+
+    Attributes:
+        template (str): the template with ``{}`` in place of every group
+        groups: the transformed `Match` objects of every group
+        combiner: the ``new_col_combiner``
+        convert: None or a function applied to the arguments of every name
+    """
+
+    def __init__(self, template, groups, combiner, convert=None):
+        self.template = template
+        self.groups = groups
+        self.combiner = combiner
+        self.convert = convert
+        self._matcher = None
+
+    def _name(self, arg):
+        return self.template.format(*[_label(match) for match in arg])
+
+    def _value(self, arg):
+        return arg if self.convert is None else self.convert(arg)
+
+    def items(self):
+        for arg in self.combiner(*self.groups):
+            yield self._name(arg), self._value(arg)
+
+    def values(self):
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        for arg in self.combiner(*self.groups):
+            yield self._name(arg)
+
+    def __len__(self):
+        """The number of combinations: the product of the group sizes for
+        `itertools.product`, the smallest group for `zip`"""
+        if self.combiner is zip:
+            return min(len(group) for group in self.groups)
+        if self.combiner is product:
+            return reduce(mul, [len(group) for group in self.groups], 1)
+        return sum(1 for _ in self.combiner(*self.groups))
+
+    def _compile_matcher(self):
+        """A regex of the template where every group is the alternation of
+        its escaped labels, or any integer for groups of ranges, and a
+        resolver per group from a matched label to its position
+        """
+        pieces = self.template.split('{}')
+        if len(pieces) - 1 != len(self.groups):
+            return None
+
+        patterns, resolvers = [], []
+        for group in self.groups:
+            if (isinstance(group, MatchGroup) and group.values is None and
+                    group.labels is None and
+                    isinstance(group.originals, range)):
+                numbers = group.originals
+                patterns.append(r'-?\d+')
+                resolvers.append(
+                    lambda label, numbers=numbers: numbers.index(int(label)))
+                continue
+
+            # the last position of every label, as in a dict
+            positions = dict((str(_label(match)), i)
+                             for i, match in enumerate(group))
+            labels = sorted(positions, key=len, reverse=True)
+            patterns.append('|'.join(map(re.escape, labels)))
+            resolvers.append(positions.__getitem__)
+
+        regex = re.escape(pieces[0]) + ''.join(
+            '(%s)%s' % (pattern, re.escape(piece))
+            for pattern, piece in zip(patterns, pieces[1:]))
+        return re.compile(regex + r'\Z'), resolvers
+
+    def _find(self, name):
+        if self.combiner in (zip, product):
+            if self._matcher is None:
+                self._matcher = self._compile_matcher() or False
+            if self._matcher:
+                regex, resolvers = self._matcher
+                found = regex.match(name)
+                if found is None:
+                    return None
+                try:
+                    positions = [resolve(label) for resolve, label in
+                                 zip(resolvers, found.groups())]
+                except ValueError:
+                    return None
+                if self.combiner is product or len(set(positions)) == 1:
+                    arg = tuple(group[i]
+                                for group, i in zip(self.groups, positions))
+                    if self._name(arg) == name:
+                        return arg
+
+        # any other combiner, or labels repeated in a zip
+        found = None
+        for arg in self.combiner(*self.groups):
+            if self._name(arg) == name:
+                found = arg
+        return found
+
+    def __getitem__(self, name):
+        arg = self._find(name)
+        if arg is None:
+            raise KeyError(name)
+        return self._value(arg)
+
+    def __contains__(self, name):
+        return self._find(name) is not None
+
+    def __repr__(self):
+        return "ArgsPlan(template=%r, groups=%d)" % (self.template,
+                                                     len(self.groups))
 
 
 class ArgsDictBuilder(object):
     def __init__(self, parser=None, transform=None, new_col_combiner=None):
+        options = current_config()
         if parser is None:
             parser = options['parser']
         if transform is None:
@@ -17,22 +153,26 @@ class ArgsDictBuilder(object):
         self.parser = parser
         # TODO: need to be consistent with this: instance or method, decide
         self.transform = transform.transform
+        self.transform_group = getattr(transform, 'transform_group', None)
         self.combiner = new_col_combiner
 
-    def build(self, new_col):
+    def plan(self, new_col):
+        """Parses and transforms ``new_col`` without combining its groups
+
+        Returns:
+            ArgsPlan
+        """
         template, group_args = self.parser.parse(new_col)
 
         def transform_groups(match_group):
+            if self.transform_group is not None:
+                return self.transform_group(match_group)
             return [self.transform(match) for match in match_group]
 
         match_args = [transform_groups(group_arg) for group_arg in group_args]
-        match_args = list(self.combiner(*match_args))
 
-        # Respect key order to preserve user imposed order on columns
-        args_dict = OrderedDict()
-        for arg in match_args:
-            match_labels = [match.label or match.value for match in arg]
-            name = template.format(*match_labels)
-            args_dict[name] = arg
+        return ArgsPlan(template, match_args, self.combiner)
 
-        return args_dict
+    def build(self, new_col):
+        # Respect key order to preserve user imposed order on columns
+        return OrderedDict(self.plan(new_col).items())
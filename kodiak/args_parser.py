@@ -1,8 +1,19 @@
 import re
 import itertools
+from bisect import bisect_right
+
+try:
+    from collections.abc import Sequence
+    from types import MappingProxyType
+except ImportError:  # Python 2
+    from collections import Sequence
+    MappingProxyType = dict
 
 DEFAULT_PATTERN = '\\{(.*?)\\}'
 
+# The payload of every `Match` without extra information
+EMPTY_PAYLOAD = MappingProxyType({})
+
 
 def _expand_range(nrange):
     """ Ranges are inclusive
@@ -39,30 +50,76 @@ def _expand_range(nrange):
 
     if int(start) > int(end):
         start, end = end, start
-        expanded_range = reversed(range(int(start), int(end) + 1, int(step)))
+        expanded_range = range(int(start), int(end) + 1, int(step))[::-1]
     else:
         expanded_range = range(int(start), int(end) + 1, int(step))
 
-    return [Match(e) for e in expanded_range]
+    return MatchGroup(expanded_range)
+
+
+def freeze_payload(payload):
+    """Returns ``payload`` as a read only mapping, empty payloads share
+    `EMPTY_PAYLOAD`"""
+    if not payload:
+        return EMPTY_PAYLOAD
+    if isinstance(payload, MappingProxyType):
+        return payload
+    return MappingProxyType(dict(payload))
 
 
 class Match(object):
     """An object generated after the process of matching and passed to the `colbuilder`
 
+    Matches are immutable, use `_replace` to derive a new one.
+
     Attributes:
         original (str): the unmodified matched string
         value (str): a possible derived string from original
         label (str): used as the name or title of the `Match`
-        payload (dict): a dict with extra information as `default_colbuilder` that can
-            be used by the `colbuilder` in `kodiak_dataframe.gencol`
+        payload (Mapping): a read only mapping with extra information as
+            `default_colbuilder` that can be used by the `colbuilder` in
+            `kodiak_dataframe.gencol`
 
     """
 
+    __slots__ = ('original', 'value', 'label', 'payload')
+
     def __init__(self, original, label=None, value=None, payload=None):
-        self.original = original
-        self.value = value if value else original
-        self.label = label
-        self.payload = payload if payload else {}
+        _set = object.__setattr__
+        _set(self, 'original', original)
+        _set(self, 'value', value if value else original)
+        _set(self, 'label', label)
+        _set(self, 'payload', freeze_payload(payload))
+
+    @classmethod
+    def _make(cls, original, label, value, payload):
+        """Creates a `Match` with its attributes as given, ``payload`` must
+        be already frozen"""
+        match = cls.__new__(cls)
+        _set = object.__setattr__
+        _set(match, 'original', original)
+        _set(match, 'value', value)
+        _set(match, 'label', label)
+        _set(match, 'payload', payload)
+        return match
+
+    def _replace(self, **changes):
+        """Returns a new `Match` with ``changes`` applied to its attributes"""
+        fields = dict((name, getattr(self, name)) for name in self.__slots__)
+        fields.update(changes)
+        if 'payload' in changes:
+            fields['payload'] = freeze_payload(fields['payload'])
+        return self._make(fields['original'], fields['label'],
+                          fields['value'], fields['payload'])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Match is immutable, use _replace")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (_restore_match, (self.original, self.label, self.value,
+                                 dict(self.payload)))
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -76,9 +133,153 @@ class Match(object):
     def __ne__(self, other):
         return not self == other
 
+    __hash__ = None
+
     def __repr__(self):
         return "Match(original=%r, label=%r, value=%r, payload=%r)" % (
-            self.original, self.label, self.value, self.payload)
+            self.original, self.label, self.value, dict(self.payload))
+
+
+def _restore_match(original, label, value, payload):
+    return Match._make(original, label, value, freeze_payload(payload))
+
+
+def _sequence_eq(left, right):
+    if not isinstance(right, (Sequence, list, tuple)):
+        return NotImplemented
+    if len(left) != len(right):
+        return False
+    return all(a == b for a, b in zip(left, right))
+
+
+class MatchGroup(Sequence):
+    """A columnar sequence of `Match` objects: parallel sequences of
+    originals, values and labels, that can be ranges, and one payload shared
+    by all of them. The `Match` objects are created only when they're read.
+    Compares equal to a list with the same `Match` objects.
+
+    Attributes:
+        originals: the unmodified matched values
+        values: the derived values, None if they're the originals
+        labels: the labels, None if there are no labels
+        payload (Mapping): the payload of every `Match`
+    """
+
+    def __init__(self, originals, values=None, labels=None, payload=None):
+        self.originals = originals
+        self.values = values
+        self.labels = labels
+        self.payload = freeze_payload(payload)
+
+    @classmethod
+    def from_matches(cls, matches):
+        """Builds a group from `Match` objects sharing the same payload"""
+        payload = matches[0].payload if matches else EMPTY_PAYLOAD
+        if any(match.payload != payload for match in matches):
+            raise ValueError("the matches of a MatchGroup share the payload")
+
+        originals = [match.original for match in matches]
+        values = [match.value for match in matches]
+        labels = [match.label for match in matches]
+        return cls(originals,
+                   None if values == originals else values,
+                   None if all(label is None for label in labels) else labels,
+                   payload)
+
+    def _column(self, column, index):
+        return None if column is None else column[index]
+
+    def __len__(self):
+        return len(self.originals)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MatchGroup(self.originals[index],
+                              self._column(self.values, index),
+                              self._column(self.labels, index), self.payload)
+
+        original = self.originals[index]
+        value = original if self.values is None else self.values[index]
+        return Match._make(original, self._column(self.labels, index), value,
+                           self.payload)
+
+    def __iter__(self):
+        values = self.originals if self.values is None else self.values
+        labels = (itertools.repeat(None)
+                  if self.labels is None else self.labels)
+        payload = self.payload
+        for original, value, label in zip(self.originals, values, labels):
+            yield Match._make(original, label, value, payload)
+
+    def _replace(self, **changes):
+        """Returns a new group with ``changes`` applied to its columns"""
+        fields = dict(originals=self.originals, values=self.values,
+                      labels=self.labels, payload=self.payload)
+        fields.update(changes)
+        return MatchGroup(**fields)
+
+    def __reduce__(self):
+        return (MatchGroup, (self.originals, self.values, self.labels,
+                             dict(self.payload)))
+
+    __eq__ = _sequence_eq
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "MatchGroup(originals=%r, values=%r, labels=%r, payload=%r)" % (
+            self.originals, self.values, self.labels, dict(self.payload))
+
+
+class MatchChain(Sequence):
+    """The `Match` objects of a template group made of many pieces, ie:
+    ``{a,1:1000,k=v}``, as a sequence of `MatchGroup`. Compares equal to a
+    list with the same `Match` objects.
+    """
+
+    def __init__(self, groups):
+        self.groups = []
+        for group in groups:
+            if isinstance(group, MatchChain):
+                self.groups.extend(group.groups)
+            elif len(group):
+                self.groups.append(group)
+        self._offsets = []
+        offset = 0
+        for group in self.groups:
+            self._offsets.append(offset)
+            offset += len(group)
+        self._len = offset
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("MatchChain index out of range")
+
+        group = bisect_right(self._offsets, index) - 1
+        return self.groups[group][index - self._offsets[group]]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.groups)
+
+    __eq__ = _sequence_eq
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "MatchChain(%r)" % (self.groups, )
 
 
 class ArgsParser(object):
@@ -88,31 +289,78 @@ class ArgsParser(object):
         self.pattern = re.compile(pattern)
         self.separator = separator
 
+    def _key(self):
+        return self.pattern.pattern, self.pattern.flags, self.separator
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self._key() == other._key()
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        # parsers that split templates the same way share compiled plans,
+        # see `plan.template_cache`
+        return hash(self._key())
+
     def parse(self, string):
-        args = self.pattern.findall(string)
-        template = self.pattern.sub("{}", string)
-        group_args = [self._parse(arg) for arg in args]
+        """Splits ``string`` in a single pass into the template, with ``{}``
+        in place of every group, and the `Match` objects of every group as
+        a `MatchGroup`, or a `MatchChain` when it mixes ranges and lists
+
+        Raises:
+            ValueError: pointing at the group that can't be parsed
+        """
+        pieces = []
+        group_args = []
+        end = 0
+        for number, found in enumerate(self.pattern.finditer(string)):
+            pieces.append(string[end:found.start()])
+            end = found.end()
+
+            arg = found.group(1) if self.pattern.groups else found.group(0)
+            try:
+                group_args.append(self._parse(arg))
+            except ValueError as e:
+                raise ValueError("%s, in group %d `%s` at position %d of %r" %
+                                 (e, number, found.group(0), found.start(),
+                                  string))
+        pieces.append(string[end:])
 
         if len(group_args) == 0:
-            group_args = [[Match(None)]]
+            group_args = [MatchGroup([None])]
 
-        return template, group_args
+        return "{}".join(pieces), group_args
 
     def _parse(self, string):
         """ parses a whole group like '1,2:4' """
-        args = string.split(self.separator)
+        groups = []
+        originals, values, labels = [], [], []
 
-        def maybe_expand(arg):
-            # return _expand_range(arg) if ':' in arg else [Match(arg)]
-            if '=' in arg:
+        def add_group():
+            groups.append(MatchGroup(
+                originals, None if values == originals else values,
+                None if all(label is None for label in labels) else labels))
+
+        for arg in string.split(self.separator):
+            if ':' in arg and '=' not in arg:
+                add_group()
+                groups.append(_expand_range(arg))
+                originals, values, labels = [], [], []
+            elif '=' in arg:
                 k, v = arg.split('=', 1)
-                return [Match(original=arg, label=k, value=v)]
-            elif ':' in arg:
-                return _expand_range(arg)
+                originals.append(arg)
+                values.append(v if v else arg)
+                labels.append(k)
             else:
-                return [Match(arg)]
-
-        args = [maybe_expand(a) for a in args]
-        args = list(itertools.chain.from_iterable(args))
+                originals.append(arg)
+                values.append(arg)
+                labels.append(None)
+        add_group()
 
-        return args
+        groups = [group for group in groups if len(group)]
+        if len(groups) == 1:
+            return groups[0]
+        return MatchChain(groups)
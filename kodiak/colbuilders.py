@@ -1,21 +1,249 @@
 """Helper methods to use as colbuilders with `colgen` and `mutcol`"""
 
+import re
+from collections import OrderedDict
+from functools import wraps
+from operator import attrgetter
+
+import numpy as np
+from pandas import Series
+from pandas.api.extensions import take
+
+from kodiak.dtypes import as_dtype
+
+_REGEX_TYPE = type(re.compile(''))
+
+
+def _declare(func, kind):
+    """Wraps ``func`` as a `colbuilder` of ``kind``, without setting
+    attributes on ``func`` itself: bound methods and numpy ufuncs don't
+    accept them"""
+
+    @wraps(func)
+    def colbuilder(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    colbuilder.colbuilder_kind = kind
+    return colbuilder
+
+
+def vectorized(func):
+    """Declares ``func`` as a vectorized `colbuilder`
+
+    A vectorized `colbuilder` receives the whole column instead of one element
+    at a time and returns the whole new column, so it's called once per
+    generated column instead of once per row.
+
+    Example:
+        >>> import numpy as np
+        >>> from kodiak.kodiak_dataframe import KodiakDataFrame
+        >>> from kodiak.colbuilders import vectorized
+        >>> df = KodiakDataFrame({'sales': [1, 2, 3]})
+        >>> df.gencol('sales_lag_{1:2}', 'sales', vectorized(lambda s, k: s.shift(k)))
+
+    Returns:
+        ``func`` wrapped as vectorized
+    """
+    return _declare(func, 'vectorized')
+
+
+def is_vectorized(func):
+    """True if ``func`` was declared with `vectorized`"""
+    return getattr(func, 'colbuilder_kind', None) == 'vectorized'
+
+
+def batch(func):
+    """Declares ``func`` as a batch `colbuilder`
+
+    A batch `colbuilder` is called once per `gencol` with the whole column,
+    the list of arguments of every generated column and the frame:
+    ``func(s, ys, frame)``. It returns one column per argument, in the same
+    order, so work can be shared between the generated columns. With
+    ``na_action`` the frame only has the rows of the column that aren't
+    missing.
+
+    Returns:
+        ``func`` wrapped as batch
+    """
+    return _declare(func, 'batch')
+
+
+def is_batch(func):
+    """True if ``func`` was declared with `batch`"""
+    return getattr(func, 'colbuilder_kind', None) == 'batch'
+
+
+def _arg_value(arg):
+    """The template value of a batch argument, plain or a tuple of `Match`
+    with ``unpack=False``, a list of values when it combines many groups"""
+    if not isinstance(arg, tuple):
+        return arg
+    values = [match.value for match in arg]
+    return values[0] if len(values) == 1 else values
+
+
+def _grouped(s, frame, by):
+    return s if by is None else s.groupby(frame[by])
+
+
+def lag(by=None):
+    """A builder function that returns a `colbuilder` of lagged columns, the
+    template arguments are the periods
+
+    Arguments:
+        by: a column name, if present the column is lagged inside each group
+
+    Example:
+        >>> df.gencol('sales_lag_{1:30}', 'sales', lag())
+        >>> df.gencol('sales_lag_{1,7}', 'sales', lag(by='store'))
+
+    Returns:
+        A batch `colbuilder`, every lag is one shift of the column
+    """
+
+    @batch
+    def func(s, periods, frame):
+        shifter = _grouped(s, frame, by)
+        return [shifter.shift(int(_arg_value(period))) for period in periods]
+
+    return func
+
+
+def lead(by=None):
+    """Like `lag` but shifts the column backwards, ``sales_lead_1`` is the
+    next value of ``sales``
+    """
+
+    @batch
+    def func(s, periods, frame):
+        shifter = _grouped(s, frame, by)
+        return [shifter.shift(-int(_arg_value(period))) for period in periods]
+
+    return func
+
+
+def _is_window(arg):
+    return isinstance(arg, int) or str(arg).isdigit()
+
+
+def rolling(agg='mean', by=None, min_periods=None):
+    """A builder function that returns a `colbuilder` of rolling window
+    aggregations
+
+    The template arguments are window sizes, or pairs of aggregation and
+    window size when combined with `itertools.product`, in any order.
+
+    Arguments:
+        agg: aggregation used when the arguments are only window sizes, any
+            method of pandas `Rolling`: ``'mean'``, ``'std'``, ``'sum'``...
+        by: a column name, if present the windows don't cross groups
+        min_periods: see `pandas.Series.rolling`
+
+    Example:
+        >>> from itertools import product
+        >>> from kodiak.config import cfg
+        >>> df.gencol('sales_roll_{7,30}', 'sales', rolling('sum'))
+        >>> df.gencol('sales_roll_{mean,std}_{7,30}', 'sales', rolling(by='store'),
+        ...           config=cfg(new_col_combiner=product))
+
+    Returns:
+        A batch `colbuilder`, all the aggregations of a window size share
+        one rolling object
+    """
+
+    def window_agg(arg):
+        arg = _arg_value(arg)
+        if isinstance(arg, (list, tuple)):
+            windows = [a for a in arg if _is_window(a)]
+            aggs = [a for a in arg if not _is_window(a)]
+            if len(windows) != 1 or len(aggs) != 1:
+                raise ValueError(
+                    "rolling arguments must be a window size and an "
+                    "aggregation, but are: %r" % (arg, ))
+            return int(windows[0]), aggs[0]
+        return int(arg), agg
+
+    @batch
+    def func(s, args, frame):
+        if by is None:
+            values, key = s, None
+        else:
+            # positional index to put the grouped results back in order
+            values = s.reset_index(drop=True)
+            key = frame[by].reset_index(drop=True)
+
+        rollers = {}
+        columns = []
+        for window, window_agg_name in map(window_agg, args):
+            if window not in rollers:
+                grouped = values if key is None else values.groupby(key)
+                rollers[window] = grouped.rolling(window,
+                                                  min_periods=min_periods)
+            column = getattr(rollers[window], window_agg_name)()
+            if key is not None:
+                # rows with a missing key belong to no group and get NaN
+                column = column.droplevel(0).reindex(values.index)
+                column = Series(column.values, index=s.index, name=s.name)
+            columns.append(column)
+
+        return columns
+
+    return func
+
 
 def as_attribute(x, y):
-    """interprets `Match` value ``y`` as an attribute of ``x``"""
+    """interprets `Match` value ``y`` as an attribute of ``x``, or a dotted
+    path of attributes as ``date.year``"""
+    if '.' in y:
+        return attrgetter(y)(x)
     return getattr(x, y)
 
 
 def as_method(x, y):
-    """interprets `Match` value ``y`` as an instance method of ``x``"""
-    return getattr(x, y)()
+    """interprets `Match` value ``y`` as an instance method of ``x``, or of
+    a dotted path of attributes as ``date.isoweekday``"""
+    return as_attribute(x, y)()
+
 
+def split_expand(pattern=" ", maxsplit=-1, regex=False):
+    """A builder function that returns a `colbuilder` of the pieces of a
+    string, the n-th generated column gets the n-th piece
 
-def splitter(pattern=None):
+    Arguments:
+        pattern: a string or compiled regex used to split a string
+        maxsplit: maximum number of splits, -1 for no limit
+        regex: True if ``pattern`` is a regular expression, always True
+            for compiled ones
+
+    Example:
+        >>> df.gencol('{first,middle,last}_name', 'name', split_expand())
+        >>> df.gencol('{key,value}', 'pair', split_expand(r'\\s*=\\s*', 1, regex=True))
+
+    Returns:
+        A batch `colbuilder`, every row is split once for all the generated
+        columns, rows with too few pieces get missing values
+    """
+
+    if isinstance(pattern, _REGEX_TYPE):
+        regex = True
+
+    @batch
+    def func(s, args, frame):
+        pieces = s.str.split(pattern, n=maxsplit, expand=True, regex=regex)
+        return [pieces[i] if i in pieces.columns else
+                Series(None, index=s.index, name=s.name, dtype=object)
+                for i in range(len(args))]
+
+    return func
+
+
+def splitter(pattern=None, maxsplit=-1, regex=False):
     """A builder function that returns a `colbuilder`
 
     Arguments:
         pattern: a string pattern used to split a string
+        maxsplit: maximum number of splits, -1 for no limit
+        regex: True if ``pattern`` is a regular expression
 
     Example:
         >>> from kodiak.kodiak_dataframe import KodiakDataFrame
@@ -30,12 +258,86 @@ def splitter(pattern=None):
         >>> # 1    Harpo Marx      Harpo      Marx
 
     Returns:
-        A function used as a `colbuilder`
+        A function used as a `colbuilder`, see `split_expand`
     """
     if pattern is None:
         pattern = " "
 
-    def func(i, x, y):
-        return x.split(pattern)[i]
+    return split_expand(pattern, maxsplit, regex)
+
+
+def group_agg(by):
+    """A builder function that returns a `colbuilder` of group statistics
+    broadcast back to every row, the template arguments are the statistics
+
+    Arguments:
+        by: a column name or a list of them with the group keys
+
+    Example:
+        >>> df.gencol('amount_{mean,sum,max,count}', 'amount', group_agg('user'))
+
+    Returns:
+        A batch `colbuilder`, all the statistics are computed in a single
+        ``groupby(...).agg`` pass
+    """
+    keys = [by] if not isinstance(by, (list, tuple)) else list(by)
+
+    @batch
+    def func(s, stats, frame):
+        stats = [_arg_value(stat) for stat in stats]
+        grouped = s.groupby([frame[key] for key in keys])
+        aggregated = grouped.agg(list(OrderedDict.fromkeys(stats)))
+
+        # rows with a missing key belong to no group
+        codes = grouped.ngroup().fillna(-1).values.astype(np.intp)
+
+        return [Series(take(aggregated[stat].values, codes, allow_fill=True),
+                       index=s.index, name=s.name)
+                for stat in stats]
+
+    return func
+
+
+def extract(pattern, flags=0, dtypes=None):
+    """A builder function that returns a `colbuilder` of the named groups of
+    a regular expression, the template arguments are the group names
+
+    Arguments:
+        pattern: a string or compiled regex with named groups
+        flags: ``re`` flags used to compile ``pattern``
+        dtypes: dict of group names to the dtype of their column
+
+    Example:
+        >>> pattern = r'(?P<host>\\S+) (?P<path>\\S+) (?P<status>\\d+)'
+        >>> df.gencol('{host,path,status}', 'line', extract(pattern, dtypes={'status': int}))
+
+    Returns:
+        A batch `colbuilder`, the pattern is compiled once and all the groups
+        are filled from a single ``Series.str.extract`` call, rows that
+        don't match get missing values
+
+    Raises:
+        ValueError: if ``dtypes`` has names that aren't groups of ``pattern``
+    """
+    regex = re.compile(pattern, flags)
+    dtypes = dtypes or {}
+
+    unknown = [name for name in dtypes if name not in regex.groupindex]
+    if unknown:
+        raise ValueError("dtypes given for unknown groups: %s" %
+                         ", ".join(map(str, unknown)))
+
+    @batch
+    def func(s, groups, frame):
+        groups = [_arg_value(group) for group in groups]
+        missing = [group for group in groups
+                   if group not in regex.groupindex]
+        if missing:
+            raise ValueError("%r has no groups named: %s" %
+                             (regex.pattern, ", ".join(missing)))
+
+        extracted = s.str.extract(regex, expand=True)
+        return [as_dtype(extracted[group].rename(s.name), dtypes.get(group))
+                for group in groups]
 
     return func
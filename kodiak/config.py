@@ -1,8 +1,15 @@
 from __future__ import absolute_import
 
+from contextlib import contextmanager
 from itertools import product
 
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
 from kodiak.args_parser import ArgsParser
+from kodiak.context import ContextVar
 from kodiak.transforms import default_transform
 
 
@@ -11,7 +18,17 @@ def base_config(parser=None,
                 new_col_combiner=None,
                 unpack=None,
                 drop=None,
-                col_pair_combiner=None):
+                col_pair_combiner=None,
+                memoize=None,
+                vectorized=None,
+                executor=None,
+                n_jobs=None,
+                chunksize=None,
+                instrument=None,
+                output=None,
+                fill_value=None,
+                category_name=None,
+                column_batch=None):
     """Default config used by `gencol` and `mutcol`
 
     Args:
@@ -33,6 +50,44 @@ def base_config(parser=None,
             controls the way this two elements are combined. Currently we use
             `product` from `itertools`, any replacement must fulfill the same
             signature.
+        memoize: False by default. Set to True to call the `colbuilder` only once
+            per unique value of `col` and broadcast the results back to every
+            row, or to a float to memoize only when the ratio between unique
+            values and rows is lower or equal, ie: 0.1. Values are unique by
+            equality, object columns that mix types are never memoized
+        vectorized (bool): False by default. Set to True if the `colbuilder`
+            receives the whole `col` column and returns the whole new column,
+            see `colbuilders.vectorized`
+        executor: None by default. Set to ``'process'``, ``'thread'`` or a
+            `concurrent.futures.Executor` to split `col` in row chunks and
+            build the new columns of each chunk in parallel. With processes
+            the `colbuilder` must be picklable: a function defined at module
+            level, not a lambda. Vectorized colbuilders always run in the
+            calling process.
+        n_jobs (int): number of workers used by ``'process'`` and ``'thread'``,
+            by default the number of CPUs
+        chunksize (int): rows per chunk, by default the rows are split in
+            four chunks per worker
+        instrument: None by default. A callable that receives the
+            `instrumentation.ColumnStats` of every generated column: time,
+            calls to the `colbuilder`, path used, dtype and memory, see
+            `instrumentation.StatsCollector` and `instrumentation.LoggingSink`
+        output (str): ``'dense'`` by default. ``'sparse'`` stores the new
+            columns as `pandas.SparseDtype`, useful for indicator columns that
+            are mostly ``False`` or ``0``. ``'category'`` collapses mutually
+            exclusive indicator columns, ie: ``"is_{us,ar,br}"``, into one
+            categorical column whose categories are the template arguments
+        fill_value: the value not stored by the ``'sparse'`` output, by default
+            ``False`` for booleans, ``0`` for integers and ``NaN`` for the rest
+        category_name (str): name of the ``'category'`` output column, by
+            default the template text without the arguments, ie: ``is``
+        column_batch (int): None by default. Set to a number of columns to
+            combine the template arguments lazily and build and attach the
+            new columns that many at a time, for templates that expand to
+            too many columns to hold all their arguments at once. The
+            arguments are paired with `col` as they're combined, without
+            `col_pair_combiner`. Ignored by batch colbuilders, that need all
+            the arguments in one call
 
 
     Returns:
@@ -44,6 +99,16 @@ def base_config(parser=None,
         match_transform=default_transform,
         new_col_combiner=zip,
         col_pair_combiner=product,
+        memoize=False,
+        vectorized=False,
+        executor=None,
+        n_jobs=None,
+        chunksize=None,
+        instrument=None,
+        output='dense',
+        fill_value=None,
+        category_name=None,
+        column_batch=None,
         parser=ArgsParser())
 
     if parser is not None:
@@ -56,6 +121,26 @@ def base_config(parser=None,
         base_cfg['unpack'] = unpack
     if col_pair_combiner is not None:
         base_cfg['col_pair_combiner'] = col_pair_combiner
+    if memoize is not None:
+        base_cfg['memoize'] = memoize
+    if vectorized is not None:
+        base_cfg['vectorized'] = vectorized
+    if executor is not None:
+        base_cfg['executor'] = executor
+    if n_jobs is not None:
+        base_cfg['n_jobs'] = n_jobs
+    if chunksize is not None:
+        base_cfg['chunksize'] = chunksize
+    if instrument is not None:
+        base_cfg['instrument'] = instrument
+    if output is not None:
+        base_cfg['output'] = output
+    if fill_value is not None:
+        base_cfg['fill_value'] = fill_value
+    if category_name is not None:
+        base_cfg['category_name'] = category_name
+    if column_batch is not None:
+        base_cfg['column_batch'] = column_batch
 
     return base_cfg
 
@@ -72,7 +157,8 @@ def restore_default_config(*keys):
     """Restore original configuration on all or specific properties
 
     If no key is present the whole configuration will be restored, if
-    keys are present only them will be restored
+    keys are present only them will be restored. `options` is updated in
+    place, references to it see the restored values.
 
     Args:
         keys: a list of strings that correspond to options
@@ -83,12 +169,124 @@ def restore_default_config(*keys):
     Raises:
         KeyError if key is not a valid option
     """
-    global options
     base_cfg = base_config()
 
     if len(keys) == 0:
-        options = base_config()
+        options.clear()
+        options.update(base_cfg)
         return
 
     for key in keys:
         options[key] = base_cfg[key]
+
+
+def _freeze(value):
+    """A hashable equivalent of ``value``: lists, dicts and sets are turned
+    into tuples and frozensets"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+class Config(Mapping):
+    """An immutable configuration, hashable so it can be used as a cache key
+
+    Example:
+        >>> config = Config(cfg(memoize=True))
+        >>> config.replace(unpack=False)["unpack"]
+        False
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._options = dict(*args, **kwargs)
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._options[key]
+
+    def __iter__(self):
+        return iter(self._options)
+
+    def __len__(self):
+        return len(self._options)
+
+    def _key(self):
+        return frozenset((k, _freeze(v)) for k, v in self._options.items())
+
+    def __hash__(self):
+        """Raises TypeError if a value can't be hashed even when frozen"""
+        if self._hash is None:
+            self._hash = hash(self._key())
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, Config):
+            return self._options == other._options
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def replace(self, **changes):
+        """Returns a new `Config` with ``changes`` applied
+
+        Raises:
+            KeyError if a key is not a valid option
+        """
+        unknown = [key for key in changes if key not in self._options]
+        if unknown:
+            raise KeyError("unknown options: %s" % ", ".join(sorted(unknown)))
+
+        options = dict(self._options)
+        options.update(changes)
+        return Config(options)
+
+    def __repr__(self):
+        return "Config(%r)" % (self._options, )
+
+
+# The configuration set by `config_context` in the current thread or task
+_context_config = ContextVar('kodiak_config', default=None)
+
+
+def current_config():
+    """Returns the configuration used by `gencol` and `mutcol` when no
+    config is given: the one of the innermost `config_context`, or the
+    global `options`
+    """
+    config = _context_config.get()
+    return options if config is None else config
+
+
+@contextmanager
+def config_context(config=None, **changes):
+    """Sets the configuration of `gencol` and `mutcol` inside the block, only
+    for the current thread or asyncio task, without changing `options`
+
+    Example:
+        >>> with config_context(memoize=True, unpack=False):
+        ...     kdf.gencol("event_{.day,.month,.year}", "event")
+
+    Args:
+        config: the configuration to start from, by default `current_config`
+        changes: options changed on top of it
+
+    Yields:
+        the `Config` in effect
+
+    Raises:
+        KeyError if a key is not a valid option
+    """
+    if config is None:
+        config = current_config()
+
+    config = Config(config).replace(**changes)
+    token = _context_config.set(config)
+    try:
+        yield config
+    finally:
+        _context_config.reset(token)
@@ -0,0 +1,48 @@
+"""Context local state shared by concurrent `gencol` calls
+
+`ContextVar` is the one of `contextvars`, every thread and every asyncio
+task sees its own value. Without `contextvars` a thread local fallback keeps
+one value per thread.
+"""
+
+from __future__ import absolute_import
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # Python < 3.7
+    import threading
+
+    class _Token(object):
+        def __init__(self, old_value):
+            self.old_value = old_value
+
+    class ContextVar(object):
+        """A per thread stand-in for `contextvars.ContextVar`"""
+
+        _missing = object()
+
+        def __init__(self, name, default=_missing):
+            self.name = name
+            self._default = default
+            self._local = threading.local()
+
+        def get(self, *default):
+            value = getattr(self._local, 'value', self._missing)
+            if value is not self._missing:
+                return value
+            if default:
+                return default[0]
+            if self._default is not self._missing:
+                return self._default
+            raise LookupError(self.name)
+
+        def set(self, value):
+            token = _Token(getattr(self._local, 'value', self._missing))
+            self._local.value = value
+            return token
+
+        def reset(self, token):
+            if token.old_value is self._missing:
+                del self._local.value
+            else:
+                self._local.value = token.old_value
@@ -0,0 +1,225 @@
+"""Output dtypes of the generated columns"""
+
+from __future__ import absolute_import
+
+import numpy as np
+from pandas import Series
+from pandas.arrays import BooleanArray, IntegerArray
+from pandas.api.types import infer_dtype, is_bool_dtype, pandas_dtype
+
+# Chooses for every generated column the smallest dtype able to hold it
+COMPACT = 'infer-compact'
+
+_INT_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def dtype_lookup(dtype, names):
+    """Returns a function from a generated column name to its dtype
+
+    Args:
+        dtype: None, a dtype, `COMPACT` or a dict of column names to any of
+            them
+        names: the generated column names, any container
+
+    Raises:
+        ValueError: if ``dtype`` has names that aren't generated
+    """
+    if not isinstance(dtype, dict):
+        return lambda name: dtype
+
+    unknown = [name for name in dtype if name not in names]
+    if unknown:
+        raise ValueError(
+            "dtype given for columns that aren't generated: %s" %
+            ", ".join(map(str, unknown)))
+
+    return dtype.get
+
+
+def resolve_dtypes(dtype, names):
+    """Returns the dtype of every generated column
+
+    Args:
+        dtype: None, a dtype, `COMPACT` or a dict of column names to any of
+            them
+        names: the generated column names
+
+    Returns:
+        dict of column names to dtype
+
+    Raises:
+        ValueError: if ``dtype`` has names that aren't generated
+    """
+    lookup = dtype_lookup(dtype, names)
+    return dict((name, lookup(name)) for name in names)
+
+
+def is_compact(dtype):
+    return isinstance(dtype, str) and dtype == COMPACT
+
+
+def _is_missing(value):
+    return value is None or value != value
+
+
+def _fits_integer(value, storage):
+    """True unless ``value`` is a float with decimals or is negative for an
+    unsigned ``storage``"""
+    if isinstance(value, (float, np.floating)) and not value.is_integer():
+        return False
+    return storage.kind != 'u' or value >= 0
+
+
+def _unsafe_cast_message(value, dtype):
+    return "cannot safely cast %s to %s" % (value, dtype)
+
+
+def nullable_dtype(dtype):
+    """Returns the pandas nullable dtype equivalent to ``dtype``, ie:
+    ``Int8`` for ``int8``, or ``dtype`` if it can already hold missing values
+    """
+    dtype = pandas_dtype(dtype)
+    if dtype.kind == 'i':
+        return pandas_dtype('Int%d' % (dtype.itemsize * 8))
+    if dtype.kind == 'u':
+        return pandas_dtype('UInt%d' % (dtype.itemsize * 8))
+    if dtype.kind == 'b':
+        return pandas_dtype('boolean')
+    return dtype
+
+
+def _fills_array(dtype):
+    """True if the values of a column of ``dtype`` can be written directly to
+    a numpy array
+    """
+    return isinstance(dtype, np.dtype) and dtype.kind in 'iufb'
+
+
+def map_values(series, func, dtype):
+    """Calls ``func`` with every element of ``series`` writing the results
+    straight into an array of ``dtype``, without an intermediate object
+    array. Missing results (None or NaN) are masked in a nullable dtype.
+
+    Raises:
+        TypeError: if an integer ``dtype`` can't hold a result exactly, like
+            `as_dtype` does
+
+    Returns:
+        Series
+    """
+    dtype = pandas_dtype(dtype)
+    if not _fills_array(dtype):
+        return as_dtype(series.map(func), dtype)
+
+    # integers are written as 64 bits and checked before the cast, numpy
+    # would wrap around the ones out of bounds of a smaller dtype
+    storage = dtype
+    if dtype.kind in 'iu':
+        storage = np.dtype(np.uint64 if dtype == np.uint64 else np.int64)
+    integers = storage.kind in 'iu'
+    missing = []
+
+    def results():
+        for i, x in enumerate(series):
+            value = func(x)
+            if _is_missing(value):
+                missing.append(i)
+                value = 0
+            elif integers and not _fits_integer(value, storage):
+                raise TypeError(_unsafe_cast_message(value, dtype))
+            yield value
+
+    try:
+        values = np.fromiter(results(), storage, count=len(series))
+    except OverflowError:
+        raise TypeError(_unsafe_cast_message('a result', dtype))
+
+    if storage != dtype:
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or
+                            values.max() > info.max):
+            raise TypeError(_unsafe_cast_message(
+                values.min() if values.min() < info.min else values.max(),
+                dtype))
+        values = values.astype(dtype)
+
+    if missing:
+        if dtype.kind == 'f':
+            values[missing] = np.nan
+        else:
+            mask = np.zeros(len(values), dtype=bool)
+            mask[missing] = True
+            if dtype.kind == 'b':
+                values = BooleanArray(values, mask)
+            else:
+                values = IntegerArray(values, mask)
+
+    return Series(values, index=series.index, name=series.name)
+
+
+def as_dtype(column, dtype):
+    """Casts ``column`` to ``dtype``, `COMPACT` or None to leave it as is,
+    columns with missing values are cast to the nullable equivalent
+    """
+    if dtype is None:
+        return column
+    if is_compact(dtype):
+        return compact(column)
+
+    dtype = pandas_dtype(dtype)
+    if _fills_array(dtype) and dtype.kind != 'f' and column.hasnans:
+        dtype = nullable_dtype(dtype)
+
+    return column.astype(dtype)
+
+
+def _smallest_int_dtype(column):
+    low, high = column.min(), column.max()
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return pandas_dtype(dtype)
+    return None
+
+
+def compact(column):
+    """Casts ``column`` to the smallest dtype able to hold its values:
+    integers are downcast, floats with integer values and missing values and
+    object columns of integers or booleans use nullable dtypes
+
+    Returns:
+        Series
+    """
+    dtype = column.dtype
+    if is_bool_dtype(dtype) or len(column) == 0:
+        return column
+
+    kind = getattr(dtype, 'kind', None)
+    if kind == 'O':
+        inferred = infer_dtype(column, skipna=True)
+        if inferred == 'boolean':
+            return column.astype('boolean' if column.hasnans else bool)
+        if inferred == 'integer':
+            values = column.dropna().astype(np.int64)
+            int_dtype = _smallest_int_dtype(values) if len(values) else None
+            if int_dtype is not None:
+                return column.astype(nullable_dtype(int_dtype))
+        return column
+
+    if kind == 'i' or kind == 'u':
+        int_dtype = _smallest_int_dtype(column)
+        if int_dtype is not None and int_dtype.itemsize < dtype.itemsize:
+            if column.hasnans:
+                int_dtype = nullable_dtype(int_dtype)
+            return column.astype(int_dtype)
+        return column
+
+    if kind == 'f' and column.hasnans:
+        # integers turned into floats by missing values
+        values = column.dropna()
+        if len(values) and (values == np.floor(values)).all():
+            int_dtype = _smallest_int_dtype(values)
+            if int_dtype is not None:
+                return column.astype(nullable_dtype(int_dtype))
+
+    return column
@@ -0,0 +1,758 @@
+"""Column computation used by `gencol` and `mutcol`"""
+
+from __future__ import absolute_import
+
+import json
+import pickle
+import warnings
+from collections import OrderedDict
+from functools import partial
+from operator import attrgetter, methodcaller
+from multiprocessing import cpu_count
+from timeit import default_timer
+
+import numpy as np
+from pandas import (Categorical, DataFrame, Series, SparseDtype, concat,
+                    factorize, to_datetime, to_numeric)
+from pandas.api.extensions import take
+from pandas.api.types import CategoricalDtype, infer_dtype
+from pandas.errors import PerformanceWarning
+
+from kodiak.dtypes import as_dtype, compact, is_compact, map_values
+from kodiak.instrumentation import ColumnStats, active_sinks, emit
+import kodiak.colbuilders as builders
+
+# Accessors whose members mirror the attributes and methods of the column
+# elements, ``.cat`` is left out because its members describe the column
+# (``codes``, ``categories``) not the elements
+ACCESSORS = ('dt', 'str')
+
+
+def _accessor_member(source, name):
+    for accessor_name in ACCESSORS:
+        if accessor_name == 'str' and not source.holds_strings():
+            continue
+        try:
+            accessor = getattr(source.series, accessor_name)
+        except AttributeError:
+            continue
+
+        if hasattr(accessor, name):
+            return getattr(accessor, name)
+
+    return None
+
+
+def accessor_column(source, match_group):
+    """Builds a whole column with a pandas accessor (``.dt`` or ``.str``)
+
+    The column can only be built when the first `Match` of ``match_group`` has
+    `colbuilders.as_attribute` or `colbuilders.as_method` as its
+    `default_colbuilder` and an accessor of the column exposes a member with
+    the same name and kind that needs no arguments.
+
+    Args:
+        source (SourceColumn): the column from where data is taken
+        match_group: the tuple of `Match` objects passed to `default_colbuilder`
+
+    Returns:
+        Series or None if the column can't be built with an accessor
+    """
+    try:
+        match = match_group[0]
+        colbuilder = match.payload.get('default_colbuilder')
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+    if colbuilder not in (builders.as_attribute, builders.as_method):
+        return None
+
+    member = _accessor_member(source, match.value)
+    if member is None:
+        return None
+
+    if colbuilder is builders.as_method:
+        if not callable(member):
+            return None
+        try:
+            member = member()
+        except TypeError:
+            # the accessor method needs arguments, ie: ``.str.encode``
+            return None
+
+    if not isinstance(member, Series):
+        return None
+
+    return member
+
+
+def _member_getter(match_group):
+    """Returns the function that reads the attribute or calls the method of
+    a `default_colbuilder` argument, None for any other argument"""
+    try:
+        match = match_group[0]
+        colbuilder = match.payload.get('default_colbuilder')
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+    if colbuilder is builders.as_attribute:
+        return attrgetter(match.value)
+    if colbuilder is builders.as_method:
+        path, _, name = match.value.rpartition('.')
+        if not path:
+            return methodcaller(name)
+        owner = attrgetter(path)
+        return lambda x: getattr(owner(x), name)()
+
+    return None
+
+
+def fused_getter(source, vals):
+    """Returns a function that reads all the attributes and methods of
+    ``vals`` from one element in a single call, as a tuple
+
+    Only when every argument has `colbuilders.as_attribute` or
+    `colbuilders.as_method` as its `default_colbuilder` and none of them can
+    be built with an accessor, see `accessor_column`.
+
+    Returns:
+        function or None
+    """
+    if len(vals) < 2:
+        return None
+
+    getters = [_member_getter(val) for val in vals]
+    if any(getter is None for getter in getters):
+        return None
+    if any(_accessor_member(source, val[0].value) is not None
+           for val in vals):
+        return None
+
+    if all(val[0].payload['default_colbuilder'] is builders.as_attribute
+           for val in vals):
+        return attrgetter(*[val[0].value for val in vals])
+
+    return lambda x: tuple(getter(x) for getter in getters)
+
+
+def _loads_json(series):
+    """Parses every unique JSON document of ``series`` once"""
+    codes, uniques = factorize(series)
+    parsed = Series([json.loads(document) for document in uniques] + [None],
+                    dtype=object)
+    # missing values are coded as -1, the last parsed value
+    return Series(parsed.values[codes], index=series.index, name=series.name)
+
+
+# Conversions of the source column applied once before building the columns
+PRE_TRANSFORMS = {
+    'datetime': to_datetime,
+    'numeric': to_numeric,
+    'json': _loads_json,
+}
+
+
+def check_pre(pre):
+    """Raises a ValueError if ``pre`` isn't None, a callable or the name of
+    one of `PRE_TRANSFORMS`"""
+    if pre is None or callable(pre) or pre in PRE_TRANSFORMS:
+        return
+    raise ValueError("pre must be a callable or one of %s, but is: %r" %
+                     (", ".join(sorted(PRE_TRANSFORMS)), pre))
+
+
+def pre_transform(series, pre):
+    """Converts the whole ``series`` with ``pre``, see `check_pre`"""
+    if pre is None:
+        return series
+    if not callable(pre):
+        pre = PRE_TRANSFORMS[pre]
+    return as_column(pre(series), series)
+
+
+def source_key(col, pre=None):
+    """The key of the `SourceColumn` of ``col`` converted with ``pre`` in the
+    ``sources`` shared between calls"""
+    return col if pre is None else (col, pre)
+
+
+class SourceColumn(object):
+    """A column read from the frame and shared by all the generated columns
+
+    Attributes:
+        series (Series): the column from where data is taken
+    """
+
+    def __init__(self, series):
+        self.series = series
+        self._factorized = None
+        self._valid = None
+        self._inferred_dtype = None
+        self._memoizable = None
+
+    def factorize(self):
+        """Returns the column codes and unique values, computed only once
+
+        Categorical columns use their own codes and categories. Missing values
+        are coded as ``-1`` and aren't part of the unique values.
+        """
+        if self._factorized is None:
+            if isinstance(self.series.dtype, CategoricalDtype):
+                codes = np.asarray(self.series.cat.codes)
+                uniques = self.series.cat.categories
+            else:
+                codes, uniques = factorize(self.series)
+            self._factorized = codes, uniques
+
+        return self._factorized
+
+    def inferred_dtype(self):
+        """Returns the `pandas.api.types.infer_dtype` of the column, skipping
+        missing values, computed only once"""
+        if self._inferred_dtype is None:
+            self._inferred_dtype = infer_dtype(self.series, skipna=True)
+
+        return self._inferred_dtype
+
+    def holds_strings(self):
+        """True when every non missing element of the column is a `str`
+
+        pandas also exposes ``.str`` on bytes and mixed object columns, where
+        its members return NaN instead of what the elements would return.
+        """
+        if isinstance(self.series.dtype, CategoricalDtype):
+            return infer_dtype(self.series.cat.categories,
+                               skipna=True) == 'string'
+        return self.inferred_dtype() == 'string'
+
+    def valid(self):
+        """Returns the mask of missing rows and the `SourceColumn` of the
+        rest, computed only once, see `scatter_missing`"""
+        if self._valid is None:
+            missing = np.asarray(self.series.isna())
+            self._valid = missing, SourceColumn(self.series[~missing])
+
+        return self._valid
+
+    def should_memoize(self, memoize):
+        """Decides if the `colbuilder` is run only over the unique values
+
+        Values are unique by equality, so object columns that mix types
+        (``1``, ``1.0`` and ``True`` are equal) are never memoized because
+        the `colbuilder` could tell them apart.
+
+        Args:
+            memoize: ``True`` to always memoize, a float to memoize when the
+                ratio between unique values and rows is lower or equal
+
+        Returns:
+            bool
+        """
+        if not memoize or len(self.series) == 0 or not self._can_memoize():
+            return False
+
+        codes, uniques = self.factorize()
+        return memoize is True or len(uniques) <= memoize * len(codes)
+
+    def _can_memoize(self):
+        """The part of `should_memoize` that doesn't depend on the option,
+        computed only once"""
+        if self._memoizable is None:
+            if (self.series.dtype == object and
+                    self.inferred_dtype().startswith('mixed')):
+                self._memoizable = False
+            else:
+                try:
+                    self.factorize()
+                    self._memoizable = True
+                except TypeError:
+                    # unhashable values can't be factorized
+                    self._memoizable = False
+
+        return self._memoizable
+
+
+def map_column(source, func, memoize=False, dtype=None):
+    """Builds a column calling ``func`` with every element of ``source``
+
+    If memoized ``func`` is called once per unique value and the results are
+    broadcast back through the codes, missing values are still passed one
+    by one.
+
+    Args:
+        source (SourceColumn): the column from where data is taken
+        func: a function of one argument
+        memoize: see `SourceColumn.should_memoize`
+        dtype: dtype of the column, the results are written straight into an
+            array of this dtype when possible
+
+    Returns:
+        tuple with the `Series`, the path used: ``'memoized'`` or
+        ``'per-row'``, and the number of calls to ``func``
+    """
+    series = source.series
+    if not source.should_memoize(memoize):
+        if dtype is None:
+            return series.map(func), 'per-row', len(series)
+        return map_values(series, func, dtype), 'per-row', len(series)
+
+    codes, uniques = source.factorize()
+    mapped = Series(uniques).map(func)
+    calls = len(mapped)
+
+    missing = codes == -1
+    if missing.any():
+        codes = codes.copy()
+        codes[missing] = len(mapped) + np.arange(missing.sum())
+        mapped = concat([mapped, series[missing].map(func)], ignore_index=True)
+        calls = len(mapped)
+
+    column = as_dtype(mapped, dtype).take(codes)
+    column.index = series.index
+    column.name = series.name
+
+    return column, 'memoized', calls
+
+
+def as_column(values, series):
+    """Wraps the result of a vectorized `colbuilder` as a column aligned with
+    ``series``, scalars are broadcast to every row
+    """
+    if isinstance(values, Series):
+        if not values.index.equals(series.index):
+            values = values.reindex(series.index)
+        return values
+
+    return Series(values, index=series.index, name=series.name)
+
+
+def build_column(source, func, val, kind='scalar', memoize=False, dtype=None):
+    """Builds one generated column
+
+    Args:
+        source (SourceColumn): the column from where data is taken
+        func: the `colbuilder`, with the enumeration index already bound
+        val: the argument extracted from the ``newcols`` template
+        kind (str): ``'vectorized'`` if ``func`` receives the whole column,
+            ``'default'`` if ``func`` is `default_colbuilder` or ``'scalar'``
+        memoize: see `SourceColumn.should_memoize`
+        dtype: dtype of the column, `dtypes.COMPACT` is left to the caller
+
+    Returns:
+        tuple with the `Series`, the path used to build it: ``'vectorized'``,
+        ``'accessor'``, ``'memoized'`` or ``'per-row'``, and the number of
+        calls to ``func``
+    """
+    if is_compact(dtype):
+        dtype = None
+
+    if kind == 'vectorized':
+        column = as_column(func(source.series, val), source.series)
+        return as_dtype(column, dtype), 'vectorized', 1
+
+    if kind == 'default':
+        column = accessor_column(source, val)
+        if column is not None:
+            return as_dtype(column, dtype), 'accessor', 0
+
+    return map_column(source, lambda x: func(x, val), memoize, dtype)
+
+
+def scatter_missing(column, missing, series, na_action):
+    """Puts ``column``, built without the missing rows of ``series``, back in
+    the rows of ``series``
+
+    Args:
+        column (Series): the column built over the rows that aren't missing
+        missing: boolean mask of the missing rows of ``series``
+        series (Series): the source column with all the rows
+        na_action: ``'ignore'`` leaves the missing rows as missing values,
+            ``'propagate'`` copies the missing values of ``series`` and any
+            other value is used to fill them
+
+    Returns:
+        Series
+    """
+    positions = np.full(len(series), -1, dtype=np.intp)
+    positions[~missing] = np.arange(len(column))
+
+    fill_value = None
+    if na_action not in ('ignore', 'propagate'):
+        fill_value = na_action
+
+    values = column.values
+    try:
+        values = take(values, positions, allow_fill=True,
+                      fill_value=fill_value)
+    except (TypeError, ValueError):
+        # extension arrays that can't hold the fill value
+        values = take(np.asarray(values, dtype=object), positions,
+                      allow_fill=True, fill_value=fill_value)
+
+    result = Series(values, index=series.index, name=column.name)
+    if na_action == 'propagate':
+        result = result.where(~missing, series.values)
+
+    return result
+
+
+def to_sparse(column, fill_value=None):
+    """Stores ``column`` as a `SparseDtype`, by default the fill value is the
+    one of its dtype: ``False`` for booleans, ``0`` for integers and ``NaN``
+    for the rest
+    """
+    if isinstance(column.dtype, SparseDtype):
+        return column
+    if fill_value is None:
+        return column.astype(SparseDtype(column.dtype))
+    return column.astype(SparseDtype(column.dtype, fill_value))
+
+
+def finish_column(column, dtype=None, output='dense', fill_value=None):
+    """Applies the steps that need the whole column: the `dtypes.COMPACT`
+    dtype and the ``'sparse'`` output
+    """
+    if is_compact(dtype):
+        column = compact(column)
+    if output == 'sparse':
+        column = to_sparse(column, fill_value)
+    return column
+
+
+def collapse_columns(columns, categories, name):
+    """Collapses mutually exclusive indicator columns into one categorical
+    column, every row takes the category of its only truthy column
+
+    Args:
+        columns (OrderedDict): new column names to indicator `Series`
+        categories (list): the category of every column
+        name (str): name of the categorical column
+
+    Returns:
+        Series
+
+    Raises:
+        ValueError: if a row has more than one truthy column
+    """
+    codes = None
+    for code, (newcol, column) in enumerate(columns.items()):
+        if codes is None:
+            index = column.index
+            codes = np.full(len(column), -1, dtype=np.int32)
+
+        hit = np.asarray(column.fillna(False).astype(bool))
+        taken = hit & (codes != -1)
+        if taken.any():
+            row = np.flatnonzero(taken)[0]
+            raise ValueError(
+                "can't collapse into `%s`, columns `%s` and `%s` are both "
+                "true in row %d" % (name, list(columns)[codes[row]], newcol,
+                                    row))
+        codes[hit] = code
+
+    return Series(Categorical.from_codes(codes, categories), index=index,
+                  name=name)
+
+
+def _build_chunk(source, col_jobs, kind, memoize, finish=None):
+    """Builds the columns of ``col_jobs``, a list of ``(func, val, dtype)``,
+    over ``source``. Defined at module level so it can run in worker
+    processes.
+
+    Args:
+        finish: a function applied to every column as soon as it's built,
+            see `finish_column`
+
+    Returns:
+        a list of `build_column` results with the seconds spent appended
+    """
+    results = []
+    for func, val, dtype in col_jobs:
+        start = default_timer()
+        column, path, calls = build_column(source, func, val, kind, memoize,
+                                           dtype)
+        if finish is not None:
+            column = finish(column, dtype)
+        results.append((column, path, calls, default_timer() - start))
+
+    return results
+
+
+def _build_batch(source, col_jobs, frame, finish):
+    """Builds all the columns of ``col_jobs`` with one call to their batch
+    `colbuilder`, see `colbuilders.batch`
+
+    Returns:
+        a list like the one of `_build_chunk`, the call is counted in the
+        first column and the seconds are split between all of them
+    """
+    series = source.series
+    func = col_jobs[0][0]
+
+    start = default_timer()
+    values = func(series, [val for _, val, _ in col_jobs], frame)
+    if isinstance(values, DataFrame):
+        values = [values.iloc[:, i] for i in range(values.shape[1])]
+    if len(values) != len(col_jobs):
+        raise ValueError(
+            "batch colbuilder returned %d columns for %d arguments" %
+            (len(values), len(col_jobs)))
+
+    columns = []
+    for value, (_, _, dtype) in zip(values, col_jobs):
+        column = as_column(value, series)
+        column = as_dtype(column, None if is_compact(dtype) else dtype)
+        columns.append(finish(column, dtype))
+    seconds = (default_timer() - start) / len(col_jobs)
+
+    return [(column, 'batch', int(i == 0), seconds)
+            for i, column in enumerate(columns)]
+
+
+def _build_fused(source, col_jobs, getter, memoize, finish):
+    """Builds all the columns of ``col_jobs`` with a single pass over
+    ``source``, ``getter`` returns a tuple with the value of every column,
+    see `fused_getter`
+
+    Returns:
+        a list like the one of `_build_batch`
+    """
+    series = source.series
+
+    start = default_timer()
+    rows, _, calls = map_column(source, getter, memoize)
+    values = list(zip(*rows)) if len(rows) else [()] * len(col_jobs)
+
+    columns = []
+    for value, (_, _, dtype) in zip(values, col_jobs):
+        column = Series(list(value), index=series.index, name=series.name,
+                        dtype=None if len(value) else object)
+        column = as_dtype(column, None if is_compact(dtype) else dtype)
+        columns.append(finish(column, dtype))
+    seconds = (default_timer() - start) / len(col_jobs)
+
+    return [(column, 'fused', calls if i == 0 else 0, seconds)
+            for i, column in enumerate(columns)]
+
+
+def _get_executor(executor, n_jobs):
+    """Returns the executor instance and True if it must be shut down after
+    use, ``executor`` is ``'process'``, ``'thread'`` or an `Executor`
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if executor == 'process':
+        return ProcessPoolExecutor(n_jobs), True
+    if executor == 'thread':
+        return ThreadPoolExecutor(n_jobs), True
+    if hasattr(executor, 'submit'):
+        return executor, False
+
+    raise ValueError(
+        "executor must be 'process', 'thread' or an Executor, but is: %r" %
+        (executor, ))
+
+
+def _uses_processes(executor):
+    from concurrent.futures import ProcessPoolExecutor
+
+    return executor == 'process' or isinstance(executor, ProcessPoolExecutor)
+
+
+def _build_parallel(series, col_jobs, kind, memoize, executor, n_jobs,
+                    chunksize):
+    """Splits ``series`` in row chunks and builds all the columns of each
+    chunk in ``executor``, the chunks are put back together in order
+    """
+    if _uses_processes(executor):
+        try:
+            pickle.dumps(col_jobs)
+        except Exception as e:
+            raise ValueError(
+                "colbuilder and template arguments must be picklable to run "
+                "in worker processes, define the colbuilder at module level "
+                "instead of using a lambda or a closure, or use "
+                "executor='thread' (%s)" % e)
+
+    n_jobs = n_jobs or cpu_count()
+    if chunksize is None:
+        # a few chunks per worker balance the load between them
+        chunksize = max(1, -(-len(series) // (4 * n_jobs)))
+
+    chunks = [series.iloc[start:start + chunksize]
+              for start in range(0, len(series), chunksize)]
+
+    pool, owned = _get_executor(executor, n_jobs)
+    try:
+        futures = [pool.submit(_build_chunk, SourceColumn(chunk), col_jobs,
+                               kind, memoize)
+                   for chunk in chunks]
+        results = [future.result() for future in futures]
+    finally:
+        if owned:
+            pool.shutdown()
+
+    # the seconds are the time spent by the workers, summed over the chunks
+    built = []
+    for column_results in zip(*results):
+        columns, _, calls, seconds = zip(*column_results)
+        built.append((concat(columns, copy=False), 'parallel', sum(calls),
+                      sum(seconds)))
+
+    return built
+
+
+def _unfinished(column, dtype):
+    return column
+
+
+def _finish_missing(column, missing, series, na_action, dtype, finish):
+    """Scatters ``column`` back to the rows of ``series`` and casts it again
+    to ``dtype``, the missing rows may have changed it"""
+    column = scatter_missing(column, missing, series, na_action)
+    column = as_dtype(column, None if is_compact(dtype) else dtype)
+    return finish(column, dtype)
+
+
+def build_columns(frame, jobs, kind='scalar', config=None, sources=None,
+                  pre=None, na_action=None):
+    """Builds all the columns generated by a `gencol` call
+
+    Every source column is read once. When an ``executor`` is configured the
+    columns of scalar colbuilders are built in parallel over row chunks.
+
+    Args:
+        frame (DataFrame): the frame from where data is taken
+        jobs (OrderedDict): new column names to ``(col, func, val, dtype)``
+            tuples, see `build_column`
+        kind (str): ``'batch'`` or a kind of `build_column`
+        config: configuration with the ``memoize``, ``executor``, ``n_jobs``,
+            ``chunksize``, ``instrument``, ``output`` and ``fill_value``
+            options
+        sources (dict): column names to `SourceColumn` already read, shared
+            between calls to reuse them, updated with the columns read
+        pre: conversion applied once to every source column before building
+            the columns, see `pre_transform`
+        na_action: if not None the colbuilder is called only with the rows
+            that aren't missing, see `scatter_missing`
+
+    Returns:
+        OrderedDict of new column names to `Series`, in the order of ``jobs``
+    """
+    if config is None:
+        config = {}
+    if sources is None:
+        sources = {}
+
+    memoize = config.get('memoize', False)
+    executor = config.get('executor')
+    sinks = active_sinks(config.get('instrument'))
+    finish = partial(finish_column, output=config.get('output', 'dense'),
+                     fill_value=config.get('fill_value'))
+
+    by_source = OrderedDict()
+    for newcol, (oldcol, func, val, dtype) in jobs.items():
+        by_source.setdefault(oldcol, []).append((newcol, func, val, dtype))
+
+    built = {}
+    for oldcol, col_jobs in by_source.items():
+        key = source_key(oldcol, pre)
+        if key not in sources:
+            sources[key] = SourceColumn(pre_transform(frame[oldcol], pre))
+        source = sources[key]
+        names = [job[0] for job in col_jobs]
+        col_jobs = [job[1:] for job in col_jobs]
+
+        missing = None
+        column_finish = finish
+        if na_action is not None:
+            missing, valid = source.valid()
+            if missing.any():
+                full, source = source.series, valid
+                # finished once the missing rows are back
+                column_finish = _unfinished
+            else:
+                missing = None
+        series = source.series
+
+        getter = None
+        if kind == 'default' and executor is None:
+            getter = fused_getter(source, [val for _, val, _ in col_jobs])
+
+        if kind == 'batch':
+            # the frame has the same rows as the column, so group keys read
+            # from it line up with the rows that aren't missing
+            rows = frame if missing is None else frame.iloc[~missing]
+            results = _build_batch(source, col_jobs, rows, column_finish)
+        elif getter is not None:
+            results = _build_fused(source, col_jobs, getter, memoize,
+                                   column_finish)
+        elif executor is None or kind == 'vectorized' or len(series) == 0:
+            # columns are finished one by one to keep only one dense column
+            results = _build_chunk(source, col_jobs, kind, memoize,
+                                   column_finish)
+        else:
+            results = _build_parallel(series, col_jobs, kind, memoize,
+                                      executor, config.get('n_jobs'),
+                                      config.get('chunksize'))
+            if missing is None:
+                # after the chunks are put together so all share the dtype
+                results = [(finish(result[0], job[2]), ) + result[1:]
+                           for job, result in zip(col_jobs, results)]
+
+        if missing is not None:
+            results = [(_finish_missing(result[0], missing, full, na_action,
+                                        job[2], finish), ) + result[1:]
+                       for job, result in zip(col_jobs, results)]
+
+        for newcol, (column, path, calls, seconds) in zip(names, results):
+            built[newcol] = column
+            if sinks:
+                emit(sinks, ColumnStats(newcol, oldcol, path, seconds, calls,
+                                        column))
+
+    return OrderedDict((newcol, built[newcol]) for newcol in jobs)
+
+
+def attach_columns(frame, columns, drop=None):
+    """Attaches ``columns`` to ``frame`` in place
+
+    Existing columns with the same name are replaced keeping their
+    position, new columns are appended in order and the ones in ``drop``
+    are removed. Only the replaced and removed columns are touched, the rest
+    of ``frame`` is never copied, and only public pandas operations are used.
+
+    Args:
+        frame (DataFrame): the frame that receives the columns
+        columns (OrderedDict): new column names to `Series`
+        drop (list): column names to remove
+
+    Returns:
+        frame
+    """
+    drop = [] if drop is None else list(drop)
+    new = OrderedDict()
+    for name, column in columns.items():
+        if name in drop:
+            continue
+        if name in frame.columns:
+            frame[name] = column
+        else:
+            new[name] = column
+
+    for name in drop:
+        if name in frame.columns:
+            del frame[name]
+
+    if len(new) == 1:
+        name, column = next(iter(new.items()))
+        frame[name] = column
+    elif new:
+        new = DataFrame(new, index=frame.index, columns=list(new))
+        with warnings.catch_warnings():
+            # pandas inserts the columns one by one and warns past 100
+            # blocks, they're all inserted here on purpose
+            warnings.simplefilter('ignore', PerformanceWarning)
+            frame[new.columns] = new
+
+    return frame
@@ -0,0 +1,149 @@
+"""Per column timing and call counts of `gencol` and `mutcol`
+
+A sink is any callable that receives a `ColumnStats` for every generated
+column. Sinks are enabled for one call with the ``instrument`` config option
+or for a block of code with the `instrument` context manager.
+
+Example:
+    >>> import kodiak
+    >>> with kodiak.instrument() as stats:
+    ...     kdf.gencol("born_{.month,.day,.year}", "born")
+    >>> stats.to_frame()
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from pandas import DataFrame
+
+from kodiak.context import ContextVar
+
+# The sinks enabled by the `instrument` blocks of the current context
+_sinks = ContextVar('kodiak_sinks', default=())
+
+
+class ColumnStats(object):
+    """Measures taken while building one generated column
+
+    Attributes:
+        name (str): name of the generated column
+        col (str): column from where data was taken
+        path (str): how the column was built: ``'batch'``, ``'vectorized'``,
+            ``'accessor'``, ``'fused'``, ``'memoized'``, ``'per-row'`` or
+            ``'parallel'``
+        seconds (float): wall time spent building the column, with an
+            executor it's the time spent by the workers summed over the chunks
+        calls (int): number of calls to the `colbuilder`
+        dtype: dtype of the generated column
+        memory (int): bytes used by the generated column
+        rows (int): rows of the generated column
+    """
+
+    FIELDS = ('name', 'col', 'path', 'seconds', 'calls', 'dtype', 'memory',
+              'rows')
+
+    def __init__(self, name, col, path, seconds, calls, column):
+        self.name = name
+        self.col = col
+        self.path = path
+        self.seconds = seconds
+        self.calls = calls
+        self.dtype = column.dtype
+        self.memory = int(column.memory_usage(index=False, deep=True))
+        self.rows = len(column)
+
+    def to_dict(self):
+        return dict((field, getattr(self, field)) for field in self.FIELDS)
+
+    def __repr__(self):
+        return "ColumnStats(%s)" % ", ".join(
+            "%s=%r" % (field, getattr(self, field)) for field in self.FIELDS)
+
+
+class StatsCollector(object):
+    """A sink that keeps the `ColumnStats` in memory"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def __call__(self, stats):
+        with self._lock:
+            self.records.append(stats)
+
+    def to_frame(self):
+        """Returns the collected stats as a `DataFrame`, one row per column"""
+        return DataFrame([stats.to_dict() for stats in self.records],
+                         columns=list(ColumnStats.FIELDS))
+
+    def clear(self):
+        with self._lock:
+            del self.records[:]
+
+    def __len__(self):
+        return len(self.records)
+
+
+class LoggingSink(object):
+    """A sink that logs every `ColumnStats`
+
+    Args:
+        logger: by default the ``kodiak`` logger
+        level: by default ``logging.INFO``
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        if logger is None:
+            logger = logging.getLogger('kodiak')
+        self.logger = logger
+        self.level = level
+
+    def __call__(self, stats):
+        self.logger.log(self.level,
+                        "gencol %s from %s: %s path, %.6fs, %d calls, %s, %d bytes",
+                        stats.name, stats.col, stats.path, stats.seconds,
+                        stats.calls, stats.dtype, stats.memory)
+
+
+def _context_sinks():
+    return _sinks.get()
+
+
+@contextmanager
+def instrument(sink=None):
+    """Sends the `ColumnStats` of every column generated inside the block
+    to ``sink``, blocks can be nested
+
+    Args:
+        sink: a callable receiving `ColumnStats`, by default a new
+            `StatsCollector`
+
+    Yields:
+        the sink
+    """
+    if sink is None:
+        sink = StatsCollector()
+
+    token = _sinks.set(_context_sinks() + (sink, ))
+    try:
+        yield sink
+    finally:
+        _sinks.reset(token)
+
+
+def active_sinks(sink=None):
+    """Returns the sinks enabled by `instrument` plus ``sink``, the one from
+    the ``instrument`` config option
+    """
+    sinks = list(_context_sinks())
+    if sink is not None:
+        sinks.append(sink)
+    return sinks
+
+
+def emit(sinks, stats):
+    for sink in sinks:
+        sink(stats)
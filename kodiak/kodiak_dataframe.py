@@ -1,55 +1,11 @@
 from __future__ import absolute_import
 
-import inspect
-
 from pandas import DataFrame
 
-from kodiak.args_dict_builder import ArgsDictBuilder
-from kodiak.args_parser import Match
-import kodiak.config as cfg
-
-
-def _unpackable(args):
-    """args are unpackable if none of it's elements has a payload
-    """
-
-    def no_payload(match_group):
-        return all(not match.payload for match in match_group)
-
-    return all(no_payload(match_group) for match_group in args.values())
-
-
-def _unpack(match_group):
-    """Returns instead of a `Match` object only it's value, also if we have
-       only one Match, return it instead of returning a list with one `Match`
-    """
-    unpacked = [match.value for match in match_group]
-    if len(unpacked) == 1:
-        unpacked = unpacked[0]
-
-    return unpacked
-
-
-def default_colbuilder(x, y):
-    """ Uses `Match` payload attribute to extract a default colbuider
-    """
-    if not isinstance(y[0], Match):
-        raise TypeError(
-            "a default colbuilder can be only found when arguments are of type Match and have a `default_colbuilder`"
-        )
-
-    colbuilder = y[0].payload['default_colbuilder']
-
-    return colbuilder(x, y[0].value)
-
-
-def _func_args_arity(func):
-    """ Inspect function arity: compatibility for Python 2.7 and 3
-    """
-    try:
-        return len(inspect.signature(func).parameters)
-    except AttributeError:
-        return len(inspect.getargspec(func).args)
+from kodiak.lazy import LazyFrame
+import kodiak.colbuilders as builders
+# default_colbuilder is imported to keep it available from this module
+from kodiak.plan import GencolPlan, default_colbuilder  # noqa: F401
 
 
 class KodiakDataFrame(DataFrame):
@@ -75,7 +31,10 @@ class KodiakDataFrame(DataFrame):
                colbuilder=None,
                drop=None,
                enum=False,
-               config=None):
+               config=None,
+               dtype=None,
+               pre=None,
+               na_action=None):
         """Generate new columns following the `newcols` pattern based on `col`
 
         Args:
@@ -98,60 +57,102 @@ class KodiakDataFrame(DataFrame):
             enum (bool): False by default. If true, it expects that the signature
                 of the ``colbuilder`` has three arguments: ``index``, ``x`` and ``y``
             config: custom configuration build with `base_config`
+            dtype: dtype of the new columns, a dict of new column names to
+                dtypes or ``'infer-compact'`` to use the smallest dtype able
+                to hold the values. Integer and boolean columns with missing
+                values use the pandas nullable dtypes.
+            pre: converts the whole `col` once before building the new
+                columns, the colbuilder receives the converted values:
+                ``'datetime'``, ``'numeric'``, ``'json'`` or a function of
+                the column. Lazy pipelines convert a column once for all the
+                calls with the same `pre`.
+            na_action: None passes the missing values of `col` to the
+                colbuilder, otherwise it's called only with the rest of the
+                rows and the missing rows of the new columns are:
+                ``'ignore'`` missing values, ``'propagate'`` the missing
+                values of `col` or any other value to fill them.
 
         Raises:
             ValueError
         """
-        if config is None:
-            config = cfg.options
+        plan = GencolPlan(newcols, col, colbuilder, config, drop, enum, dtype,
+                          pre, na_action)
 
-        if colbuilder is None and enum:
-            raise ValueError(
-                "Default Colbuilder is unsupported for enum = True")
+        return plan.apply(self)
 
-        if colbuilder is None:
-            colbuilder = default_colbuilder
+    def mutcol(self, col, colbuilder=None, config=None, dtype=None,
+               pre=None, na_action=None):
+        """ Mutates the column `col`. Similar to gencol with newcols and col equals to `col`
+        """
+        return self.gencol(
+            col,
+            col,
+            colbuilder=colbuilder,
+            drop=False,
+            enum=False,
+            config=config,
+            dtype=dtype,
+            pre=pre,
+            na_action=na_action)
 
-        if drop is None:
-            drop = config['drop']
+    def gengroupcol(self, newcols, col, by, drop=None, config=None,
+                    dtype=None, pre=None):
+        """Generates columns with statistics of `col` in the groups of `by`
 
-        args_builder = ArgsDictBuilder(config['parser'],
-                                       config['match_transform'],
-                                       config['new_col_combiner'])
+        The ``newcols`` template arguments are the statistics, any
+        aggregation accepted by ``groupby(...).agg``. All of them are computed
+        in a single ``groupby`` pass and broadcast back to every row.
 
-        args = args_builder.build(newcols)
+        Example:
+            >>> kdf.gengroupcol("amount_{mean,sum,max,count}", "amount", by="user")
+            >>> kdf.gengroupcol("amount_{avg=mean}", "amount", by=["user", "day"])
 
-        return self._gencol(args, col, colbuilder, drop, enum, config)
+        Args:
+            newcols (str) : new column/s template string
+            col (str) : column name from where data is taken
+            by: a column name or a list of them with the group keys
+            drop (bool): True if you want to drop the column `col`
+            config: custom configuration build with `base_config`
+            dtype: see `gencol`
+            pre: see `gencol`
+        """
+        return self.gencol(newcols, col, builders.group_agg(by), drop=drop,
+                           config=config, dtype=dtype, pre=pre)
 
-    def _gencol(self, args, col, colbuilder, drop, enum, config):
-        combiner = config['col_pair_combiner']
+    def gencol_many(self, specs):
+        """Runs many `gencol` calls: every spec is a tuple with the positional
+        arguments of `gencol` or a dict with its keyword arguments
 
-        if config['unpack'] and _unpackable(args):
-            args = {k: _unpack(match_group) for k, match_group in args.items()}
+        All the specs are compiled and checked before running any of them,
+        every source column is read once and the new columns are attached in
+        a single insertion, see `LazyFrame`.
 
-        col_args = combiner([col], args.items())
+        Example:
+            >>> kdf.gencol_many([
+            ...     ("born_{.month,.year}", "born"),
+            ...     {"newcols": "{first,last}_name", "col": "name",
+            ...      "colbuilder": splitter()},
+            ... ])
 
-        if enum or _func_args_arity(colbuilder) == 3:
-            col_args = enumerate(col_args)
-            for idx, (oldcol, (newcol, val)) in col_args:
-                self[newcol] = self[oldcol].map(
-                    lambda x: colbuilder(idx, x, val))
-        else:
-            for oldcol, (newcol, val) in col_args:
-                self[newcol] = self[oldcol].map(lambda x: colbuilder(x, val))
+        Raises:
+            ValueError: if a spec is wrong or two specs write the same column
+        """
+        return self.lazy().gencol_many(specs).collect()
 
-        if drop:
-            self.drop(col, axis=1, inplace=True)
+    def mutcol_many(self, specs):
+        """Runs many `mutcol` calls, like `gencol_many` with the arguments of
+        `mutcol`
+        """
+        return self.lazy().mutcol_many(specs).collect()
 
-        return self
+    def lazy(self):
+        """Starts a lazy pipeline of `gencol` and `mutcol` calls that are run
+        together with `LazyFrame.collect`
 
-    def mutcol(self, col, colbuilder=None, config=None):
-        """ Mutates the column `col`. Similar to gencol with newcols and col equals to `col`
+        Example:
+            >>> kdf.lazy().gencol("born_{.month,.year}", "born").collect()
+
+        Returns:
+            LazyFrame
         """
-        return self.gencol(
-            col,
-            col,
-            colbuilder=colbuilder,
-            drop=False,
-            enum=False,
-            config=config)
+        return LazyFrame(self)
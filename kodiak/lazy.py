@@ -0,0 +1,204 @@
+"""Lazy `gencol` and `mutcol` pipelines executed in a single pass"""
+
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+from kodiak.engine import attach_columns
+from kodiak.plan import GencolPlan
+
+
+class _ColumnView(object):
+    """Reads columns from the columns built so far or from the frame"""
+
+    def __init__(self, frame, built, dropped):
+        self.frame = frame
+        self.built = built
+        self.dropped = dropped
+
+    def __getitem__(self, name):
+        if name in self.built:
+            return self.built[name]
+        if name in self.dropped:
+            raise KeyError(name)
+        return self.frame[name]
+
+
+def _invalidate(sources, name):
+    """Forgets the source columns read from ``name``, converted or not"""
+    for key in list(sources):
+        if key == name or (isinstance(key, tuple) and key[0] == name):
+            del sources[key]
+
+
+def run_plans(frame, plans):
+    """Runs ``plans`` over ``frame`` and attaches the new columns in place
+
+    Every source column is read, converted and factorized once for all the
+    plans that use it with the same ``pre``, new columns are kept aside until
+    the end and attached to the frame in a single insertion. Plans see the
+    columns created or mutated by the previous ones, as if they were run one
+    by one.
+
+    Returns:
+        frame
+    """
+    built = OrderedDict()
+    dropped = OrderedDict()
+    sources = {}
+    view = _ColumnView(frame, built, dropped)
+
+    for plan in plans:
+        columns = plan.columns(view, sources)
+
+        for name, column in columns.items():
+            # a column written by this plan must be read again by the next
+            _invalidate(sources, name)
+            built.pop(name, None)
+            built[name] = column
+
+        if plan.drop:
+            _invalidate(sources, plan.col)
+            built.pop(plan.col, None)
+            if plan.col in frame.columns:
+                dropped[plan.col] = True
+
+    # columns dropped from the frame and created again go to the end
+    recreated = [name for name in dropped if name in built]
+    if recreated:
+        attach_columns(frame, OrderedDict(), list(dropped))
+        return attach_columns(frame, built)
+
+    return attach_columns(frame, built, list(dropped))
+
+
+def _check_collisions(plans):
+    """Raises a ValueError if two plans write the same column"""
+    writers = OrderedDict()
+    for position, plan in enumerate(plans):
+        for name in plan.outputs:
+            writers.setdefault(name, []).append(position)
+
+    collisions = ["`%s` (specs %s)" % (name, ", ".join(map(str, positions)))
+                  for name, positions in writers.items() if len(positions) > 1]
+    if collisions:
+        raise ValueError("specs write the same columns: %s" %
+                         "; ".join(collisions))
+
+
+def _compile_specs(record, specs):
+    """Compiles every spec with ``record``, a `PlanRecorder` method, specs are
+    tuples of positional arguments or dicts of keyword arguments
+
+    Returns:
+        list of `GencolPlan`
+
+    Raises:
+        ValueError or TypeError: naming the position of the wrong spec
+    """
+    recorder = PlanRecorder()
+    record = getattr(recorder, record)
+
+    for position, spec in enumerate(specs):
+        try:
+            if isinstance(spec, dict):
+                record(**spec)
+            else:
+                record(*spec)
+        except (TypeError, ValueError) as e:
+            raise type(e)("spec %d %r: %s" % (position, spec, e))
+
+    _check_collisions(recorder.plans)
+    return recorder.plans
+
+
+class PlanRecorder(object):
+    """Records `gencol` and `mutcol` calls as compiled `GencolPlan`, calls are
+    compiled when recorded so errors in templates are raised early
+    """
+
+    def __init__(self):
+        self.plans = []
+
+    def gencol(self, newcols, col, colbuilder=None, drop=None, enum=False,
+               config=None, dtype=None, pre=None, na_action=None):
+        """Records a `gencol` call, see `KodiakDataFrame.gencol`
+
+        Returns:
+            self
+        """
+        self.plans.append(
+            GencolPlan(newcols, col, colbuilder, config, drop, enum, dtype,
+                       pre, na_action))
+        return self
+
+    def mutcol(self, col, colbuilder=None, config=None, dtype=None, pre=None,
+               na_action=None):
+        """Records a `mutcol` call, see `KodiakDataFrame.mutcol`
+
+        Returns:
+            self
+        """
+        return self.gencol(col, col, colbuilder, drop=False, config=config,
+                           dtype=dtype, pre=pre, na_action=na_action)
+
+    def gencol_many(self, specs):
+        """Records many `gencol` calls, every spec is a tuple with the
+        positional arguments of `gencol` or a dict with its keyword arguments.
+        All the specs are compiled before recording any of them.
+
+        Example:
+            >>> kdf.lazy().gencol_many([
+            ...     ("born_{.month,.year}", "born"),
+            ...     {"newcols": "{first,last}_name", "col": "name",
+            ...      "colbuilder": splitter()},
+            ... ]).collect()
+
+        Returns:
+            self
+
+        Raises:
+            ValueError: if a spec is wrong or two specs write the same column
+        """
+        self.plans.extend(_compile_specs('gencol', specs))
+        return self
+
+    def mutcol_many(self, specs):
+        """Records many `mutcol` calls, like `gencol_many` with the arguments
+        of `mutcol`
+
+        Returns:
+            self
+        """
+        self.plans.extend(_compile_specs('mutcol', specs))
+        return self
+
+
+class LazyFrame(PlanRecorder):
+    """Records `gencol` and `mutcol` calls over a frame and runs them together
+    on `collect`, see `run_plans`
+
+    Example:
+        >>> kdf.lazy() \\
+        ...    .gencol("born_{.month,.day,.year}", "born") \\
+        ...    .mutcol("name", lambda x, y: x.title()) \\
+        ...    .gencol("{first,last}_name", "name", splitter()) \\
+        ...    .collect()
+    """
+
+    def __init__(self, frame):
+        super(LazyFrame, self).__init__()
+        self.frame = frame
+
+    def collect(self):
+        """Runs the recorded calls and attaches the new columns to the frame
+        in place
+
+        Returns:
+            the frame
+        """
+        plans, self.plans = self.plans, []
+        return run_plans(self.frame, plans)
+
+    def __repr__(self):
+        return "LazyFrame(plans=%r)" % self.plans
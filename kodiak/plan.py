@@ -0,0 +1,386 @@
+"""Compiled `gencol` calls that can be applied to many frames"""
+
+from __future__ import absolute_import
+
+import inspect
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from kodiak.args_dict_builder import ArgsDictBuilder
+from kodiak.args_parser import Match, MatchChain, MatchGroup
+from kodiak.dtypes import dtype_lookup, resolve_dtypes
+from kodiak.engine import (attach_columns, build_columns, check_pre,
+                           collapse_columns)
+import kodiak.colbuilders as builders
+import kodiak.config as cfg
+
+
+def _unpackable(args):
+    """args are unpackable if none of it's elements has a payload
+    """
+
+    def no_payload(match_group):
+        return all(not match.payload for match in match_group)
+
+    return all(no_payload(match_group) for match_group in args.values())
+
+
+def _group_payloads(group):
+    """The payloads of a group, one per columnar `MatchGroup`"""
+    if isinstance(group, MatchGroup):
+        return [group.payload]
+    if isinstance(group, MatchChain):
+        return [payload for g in group.groups for payload in _group_payloads(g)]
+    return [match.payload for match in group]
+
+
+def _groups_unpackable(groups):
+    """Like `_unpackable` but over the groups of an `ArgsPlan`"""
+    return all(not payload for group in groups
+               for payload in _group_payloads(group))
+
+
+def _unpack(match_group):
+    """Returns instead of a `Match` object only it's value, also if we have
+       only one Match, return it instead of returning a list with one `Match`
+    """
+    unpacked = [match.value for match in match_group]
+    if len(unpacked) == 1:
+        unpacked = unpacked[0]
+
+    return unpacked
+
+
+def default_colbuilder(x, y):
+    """ Uses `Match` payload attribute to extract a default colbuider
+    """
+    if not isinstance(y[0], Match):
+        raise TypeError(
+            "a default colbuilder can be only found when arguments are of type Match and have a `default_colbuilder`"
+        )
+
+    colbuilder = y[0].payload['default_colbuilder']
+
+    return colbuilder(x, y[0].value)
+
+
+def _func_args_arity(func):
+    """ Inspect function arity: compatibility for Python 2.7 and 3
+    """
+    try:
+        return len(inspect.signature(func).parameters)
+    except AttributeError:
+        return len(inspect.getargspec(func).args)
+    except ValueError:
+        # builtins without a signature, ie: numpy ufuncs
+        return None
+
+
+class LRUCache(object):
+    """A thread safe mapping that keeps only the ``maxsize`` most recently
+    used keys
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Expanded template arguments shared by every `gencol` call with the same
+# template and configuration
+template_cache = LRUCache()
+
+
+def _config_key(config):
+    """A hashable snapshot of ``config``, None if some value isn't hashable"""
+    key = config if isinstance(config, cfg.Config) else cfg.Config(config)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _category_output(newcols, names, config):
+    """Returns the categories and the column name of the ``'category'``
+    output, the categories are the new column names without the template
+    text before the first argument and after the last one
+    """
+    template, _ = config['parser'].parse(newcols)
+    if '{}' not in template:
+        raise ValueError(
+            "output='category' needs a template with arguments, but is: %s" %
+            newcols)
+
+    pieces = template.split('{}')
+    prefix, suffix = pieces[0], pieces[-1]
+    categories = [name[len(prefix):len(name) - len(suffix)] for name in names]
+
+    name = config.get('category_name')
+    if name is None:
+        name = '_'.join(piece.strip('_') for piece in (prefix, suffix)
+                        if piece.strip('_'))
+    if not name:
+        raise ValueError(
+            "can't name the output='category' column of `%s`, set the "
+            "category_name option" % newcols)
+
+    return categories, name
+
+
+def _build_args(newcols, config):
+    """Expands ``newcols`` into the `OrderedDict` of arguments, unpacked if
+    the configuration allows it, using `template_cache`
+    """
+    key = _config_key(config)
+    if key is not None:
+        key = (newcols, key)
+        args = template_cache.get(key)
+        if args is not None:
+            return args
+
+    args_builder = ArgsDictBuilder(config['parser'],
+                                   config['match_transform'],
+                                   config['new_col_combiner'])
+
+    args = args_builder.build(newcols)
+
+    if config['unpack'] and _unpackable(args):
+        args = OrderedDict((k, _unpack(match_group))
+                           for k, match_group in args.items())
+
+    if key is not None:
+        template_cache.set(key, args)
+
+    return args
+
+
+def _plan_args(newcols, config):
+    """Like `_build_args` but returns the lazy `ArgsPlan` of ``newcols``"""
+    args_builder = ArgsDictBuilder(config['parser'],
+                                   config['match_transform'],
+                                   config['new_col_combiner'])
+
+    args = args_builder.plan(newcols)
+
+    if config['unpack'] and _groups_unpackable(args.groups):
+        args.convert = _unpack
+
+    return args
+
+
+class GencolPlan(object):
+    """A `gencol` call compiled once: the expanded arguments, the resolved
+    `colbuilder` and its arity are frozen, so it can be applied to many frames
+
+    With the ``column_batch`` option the arguments are combined lazily and
+    the new columns are built and attached a batch at a time.
+
+    Attributes:
+        args (OrderedDict): new column names to the arguments passed to the
+            `colbuilder`, an `ArgsPlan` with ``column_batch``
+        col (str): column name from where data is taken
+        colbuilder: the resolved `colbuilder`
+        drop (bool): True if `col` is dropped after the new columns are created
+        kind (str): ``'batch'``, ``'vectorized'``, ``'default'`` or
+            ``'scalar'``
+        pre: conversion applied once to `col` before building the columns
+        na_action: what to do with the missing values of `col`, None to pass
+            them to the `colbuilder`
+        config: the configuration used to compile the plan
+    """
+
+    def __init__(self, newcols, col, colbuilder=None, config=None, drop=None,
+                 enum=False, dtype=None, pre=None, na_action=None):
+        if config is None:
+            config = cfg.current_config()
+
+        if colbuilder is None and enum:
+            raise ValueError(
+                "Default Colbuilder is unsupported for enum = True")
+
+        if colbuilder is None:
+            colbuilder = default_colbuilder
+
+        check_pre(pre)
+
+        if drop is None:
+            drop = config['drop']
+
+        self.newcols = newcols
+        self.col = col
+        self.colbuilder = colbuilder
+        self.drop = drop
+        self.pre = pre
+        self.na_action = na_action
+        self.config = dict(config)
+        if builders.is_batch(colbuilder):
+            self.kind = 'batch'
+        elif config.get('vectorized') or builders.is_vectorized(colbuilder):
+            self.kind = 'vectorized'
+        elif colbuilder is default_colbuilder:
+            self.kind = 'default'
+        else:
+            self.kind = 'scalar'
+
+        self.column_batch = config.get('column_batch')
+        if config.get('output') == 'category' or self.kind == 'batch':
+            # all the indicator columns are needed to collapse them, and
+            # batch colbuilders see the arguments by position, so a batch of
+            # columns would restart them at the first one
+            self.column_batch = None
+
+        if self.column_batch:
+            self.args = _plan_args(newcols, config)
+        else:
+            self.args = _build_args(newcols, config)
+
+        # batch colbuilders receive all the arguments in order
+        self._enumerated = self.kind != 'batch' and (
+            enum or _func_args_arity(colbuilder) == 3)
+
+        if self.column_batch:
+            self._dtype_of = dtype_lookup(dtype, self.args)
+            self.jobs = None
+        else:
+            col_args = list(self._col_args())
+            self._dtype_of = resolve_dtypes(
+                dtype, [newcol for _, (newcol, _) in col_args]).get
+            self.jobs = OrderedDict(self._iter_jobs(col_args))
+
+        self.categories = self.category_name = None
+        if config.get('output') == 'category':
+            self.categories, self.category_name = _category_output(
+                newcols, list(self.jobs), config)
+
+    def _col_args(self):
+        return self.config['col_pair_combiner']([self.col], self.args.items())
+
+    def _iter_jobs(self, col_args):
+        for idx, (oldcol, (newcol, val)) in enumerate(col_args):
+            func = (partial(self.colbuilder, idx) if self._enumerated else
+                    self.colbuilder)
+            yield newcol, (oldcol, func, val, self._dtype_of(newcol))
+
+    def batches(self):
+        """Yields the jobs of the new columns, see `engine.build_columns`, in
+        `OrderedDict` batches of at most ``column_batch`` columns"""
+        if not self.column_batch:
+            yield self.jobs
+            return
+
+        # col_pair_combiner is skipped, `itertools.product` would read every
+        # combination of the `ArgsPlan` before yielding the first one
+        col_args = ((self.col, arg) for arg in self.args.items())
+        batch = OrderedDict()
+        for newcol, job in self._iter_jobs(col_args):
+            batch[newcol] = job
+            if len(batch) == self.column_batch:
+                yield batch
+                batch = OrderedDict()
+        if batch:
+            yield batch
+
+    @property
+    def outputs(self):
+        """The names of the columns written by the plan"""
+        if self.category_name is not None:
+            return [self.category_name]
+        if self.jobs is None:
+            return list(self.args)
+        return list(self.jobs)
+
+    def columns(self, frame, sources=None):
+        """Builds the new columns over ``frame`` without attaching them
+
+        Args:
+            frame (DataFrame): the frame from where data is taken
+            sources (dict): source columns shared between plans, see
+                `engine.build_columns`
+
+        Returns:
+            OrderedDict of new column names to `Series`
+        """
+        if sources is None:
+            sources = {}
+
+        columns = OrderedDict()
+        for jobs in self.batches():
+            columns.update(build_columns(frame, jobs, self.kind, self.config,
+                                         sources, self.pre, self.na_action))
+
+        if self.category_name is not None:
+            column = collapse_columns(columns, self.categories,
+                                      self.category_name)
+            columns = OrderedDict([(self.category_name, column)])
+
+        return columns
+
+    def apply(self, frame):
+        """Generates the new columns in ``frame`` in place, as `gencol` does
+
+        Returns:
+            frame
+        """
+        drop = [self.col] if self.drop else []
+        if not self.column_batch:
+            return attach_columns(frame, self.columns(frame), drop)
+
+        # the source columns are read once, before any batch is attached
+        sources = {}
+        for jobs in self.batches():
+            attach_columns(frame, build_columns(frame, jobs, self.kind,
+                                                self.config, sources,
+                                                self.pre, self.na_action))
+        return attach_columns(frame, OrderedDict(), drop) if drop else frame
+
+    def __repr__(self):
+        if self.jobs is None:
+            return "GencolPlan(newcols=%r, col=%r, columns=%d)" % (
+                self.newcols, self.col, len(self.args))
+        return "GencolPlan(newcols=%r, col=%r, columns=%r)" % (
+            self.newcols, self.col, list(self.jobs))
+
+
+def compile(newcols, col, colbuilder=None, config=None, drop=None,
+            enum=False, dtype=None, pre=None, na_action=None):
+    """Compiles a `gencol` call into a reusable `GencolPlan`
+
+    Example:
+        >>> import kodiak
+        >>> plan = kodiak.compile("born_{.month,.day,.year}", "born")
+        >>> for frame in frames:
+        ...     plan.apply(frame)
+
+    Args: see `KodiakDataFrame.gencol`
+
+    Returns:
+        GencolPlan
+    """
+    return GencolPlan(newcols, col, colbuilder, config, drop, enum, dtype,
+                      pre, na_action)
@@ -0,0 +1,162 @@
+"""Streaming `gencol` and `mutcol` over frames read in chunks"""
+
+from __future__ import absolute_import
+
+from pandas import RangeIndex
+
+from kodiak.kodiak_dataframe import KodiakDataFrame
+from kodiak.lazy import PlanRecorder, run_plans
+
+
+class Stream(PlanRecorder):
+    """Applies the recorded `gencol` and `mutcol` calls to every frame of an
+    iterator of frames, ie: ``pd.read_csv(path, chunksize=...)``
+
+    The calls are compiled once and applied to one chunk at a time, so
+    writing the result with `to_csv` or `to_parquet` keeps in memory about
+    one chunk no matter the size of the input. Like the reader, a stream can
+    be consumed only once.
+
+    Example:
+        >>> import kodiak
+        >>> reader = pd.read_csv("events.csv", chunksize=100000)
+        >>> kodiak.stream(reader) \\
+        ...    .gencol("born_{.month,.day,.year}", "born") \\
+        ...    .to_csv("features.csv", index=False)
+    """
+
+    def __init__(self, reader):
+        super(Stream, self).__init__()
+        self.reader = reader
+
+    def __iter__(self):
+        """Yields every chunk as a `KodiakDataFrame` with the new columns"""
+        for chunk in self.reader:
+            yield run_plans(KodiakDataFrame(chunk), self.plans)
+
+    def to_csv(self, path, **kwargs):
+        """Writes the chunks one by one to a csv file, the header is written
+        only with the first chunk
+
+        Args:
+            path: file path or buffer
+            kwargs: passed to `DataFrame.to_csv`
+        """
+        header = kwargs.pop('header', True)
+        mode = kwargs.pop('mode', 'w')
+
+        for chunk in self:
+            chunk.to_csv(path, header=header, mode=mode, **kwargs)
+            header = False
+            mode = 'a'
+
+    def to_parquet(self, path, **kwargs):
+        """Writes the chunks one by one as row groups of a parquet file
+
+        A parquet file has a single schema, it's taken from the first chunks
+        and every chunk is cast to it. Chunks are held back while a column
+        has only missing values, until its type is known. Later chunks may
+        have missing values or smaller types, ie: ``int8`` for an ``int16``
+        column, but not larger ones: pass an explicit ``dtype`` to `gencol`
+        instead of ``'infer-compact'``, or the ``schema`` of the file.
+
+        Args:
+            path: file path or buffer
+            kwargs: ``index`` and ``schema`` are passed to
+                `pyarrow.Table.from_pandas`, the rest to
+                `pyarrow.parquet.ParquetWriter`. By default the index is
+                written only when the first chunk doesn't have a `RangeIndex`
+
+        Raises:
+            ImportError: if pyarrow isn't installed
+            ValueError: if a chunk doesn't fit the schema of the file
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("to_parquet requires pyarrow to be installed")
+
+        index = kwargs.pop('index', None)
+        schema = kwargs.pop('schema', None)
+        writer = None
+        pending = []
+        try:
+            for number, chunk in enumerate(self):
+                if index is None:
+                    # decided once so every row group has the same columns
+                    index = not isinstance(chunk.index, RangeIndex)
+                table = pa.Table.from_pandas(chunk, schema=schema,
+                                             preserve_index=index)
+                if writer is not None:
+                    writer.write_table(_conform(table, writer.schema, number))
+                    continue
+
+                pending.append(table)
+                unified = _unify_schemas([t.schema for t in pending])
+                if any(pa.types.is_null(field.type) for field in unified):
+                    continue
+                writer = pq.ParquetWriter(path, unified, **kwargs)
+                for table in pending:
+                    writer.write_table(_conform(table, unified, number))
+                del pending[:]
+
+            if pending:
+                unified = _unify_schemas([t.schema for t in pending])
+                writer = pq.ParquetWriter(path, unified, **kwargs)
+                for table in pending:
+                    writer.write_table(_conform(table, unified, number))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def __repr__(self):
+        return "Stream(plans=%r)" % self.plans
+
+
+def _unify_schemas(schemas):
+    """The schema with the fields of ``schemas`` promoted to a common type,
+    ie: ``null`` to any type and ``int8`` to ``int16``"""
+    import pyarrow as pa
+
+    try:
+        return pa.unify_schemas(schemas, promote_options='permissive')
+    except TypeError:
+        # pyarrow < 14 only promotes null fields
+        return pa.unify_schemas(schemas)
+
+
+def _conform(table, schema, number):
+    """Casts ``table``, the chunk ``number``, to ``schema`` if it holds all
+    its values, raises a ValueError otherwise"""
+    import pyarrow as pa
+
+    if table.schema.equals(schema, check_metadata=False):
+        return table
+
+    try:
+        unified = _unify_schemas([schema, table.schema])
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        unified, reason = None, str(e)
+    else:
+        reason = "it needs %s" % ", ".join(
+            "%s: %s" % (field.name, field.type) for field in unified
+            if field.name not in schema.names or
+            not schema.field(field.name).type.equals(field.type))
+
+    if unified is None or not unified.equals(schema, check_metadata=False):
+        raise ValueError(
+            "chunk %d doesn't fit the parquet schema of the first chunks, %s. "
+            "Pass an explicit dtype or the schema of the file" %
+            (number, reason))
+
+    return table.select(schema.names).cast(schema)
+
+
+def stream(reader):
+    """Starts a `Stream` over ``reader``, any iterable of frames
+
+    Returns:
+        Stream
+    """
+    return Stream(reader)
@@ -1,32 +1,185 @@
 from __future__ import absolute_import
 
+import re
+
+from kodiak.args_parser import Match, MatchChain, MatchGroup, freeze_payload
 import kodiak.colbuilders as builders
 
+_COLBUILDER_PAYLOADS = dict(
+    (colbuilder, freeze_payload({'default_colbuilder': colbuilder}))
+    for colbuilder in (builders.as_attribute, builders.as_method))
+
+
+# ASCII characters that can't be part of a number, ie: ``1e5``, ``-2j``,
+# ``nan`` or ``infinity``, they reject most names without parsing them
+_NUMBER_CHARS = set("0123456789+-.eEjJ_()nNaAiIfFtTyY")
+_NOT_NUMBER = re.compile("[%s]" % re.escape("".join(
+    c for c in map(chr, range(128))
+    if c not in _NUMBER_CHARS and not c.isspace())))
+
 
 def is_number(s):
+    s = str(s)
+    if _NOT_NUMBER.search(s):
+        return False
     try:
-        complex(str(s))
+        complex(s)
     except ValueError:
         return False
     return True
 
 
+def _with_colbuilder(payload, colbuilder):
+    """Returns ``payload`` with ``colbuilder`` as `default_colbuilder`, the
+    payloads without other keys are shared between all the matches"""
+    if not payload:
+        return _COLBUILDER_PAYLOADS[colbuilder]
+    return dict(payload, default_colbuilder=colbuilder)
+
+
+def _claims(transform, value):
+    """True if ``value`` has the syntax declared by ``transform``"""
+    if transform.prefix is not None and not value.startswith(transform.prefix):
+        return False
+    if transform.suffix is not None and not value.endswith(transform.suffix):
+        return False
+    return True
+
+
+def _strip(transform, value):
+    """Removes from ``value`` the syntax declared by ``transform``"""
+    if transform.prefix is not None:
+        value = value[len(transform.prefix):]
+    if transform.suffix is not None:
+        value = value[:len(value) - len(transform.suffix)]
+    return value
+
+
+def _describe(transform):
+    parts = []
+    if transform.prefix is not None:
+        parts.append("start with `%s`" % transform.prefix)
+    if transform.suffix is not None:
+        parts.append("end with `%s`" % transform.suffix)
+    return " and ".join(parts)
+
+
+def _declares_syntax(transform):
+    return all(hasattr(transform, name)
+               for name in ('prefix', 'suffix', 'kind', 'colbuilder'))
+
+
 class ComposerTransform(object):
     def __init__(self, transforms):
         """
+        When every transform declares the syntax it claims, a ``prefix``
+        and/or ``suffix``, its ``kind`` and its ``colbuilder``, they're
+        compiled into a single classifier that looks at every `Match` once.
+
         Arguments:
             transforms: a list of transforms
         """
         self.transforms = transforms
+        self.compiled = all(_declares_syntax(t) for t in transforms)
 
     def transform(self, match):
+        if self.compiled:
+            return self._classify(match)
+
         for t in self.transforms:
             match = t.transform(match)
 
         return match
 
+    def _classify_value(self, value):
+        """Returns the stripped ``value`` and the transform whose syntax it
+        has, or None, ``is_number`` is called at most twice
+
+        Raises:
+            ValueError: in case ``value`` is ambiguous
+        """
+        if value is None or not isinstance(value, str) or is_number(value):
+            return value, None
+
+        claimed = [t for t in self.transforms if _claims(t, value)]
+        if not claimed:
+            return value, None
+
+        if len(claimed) > 1:
+            raise ValueError("`%s` is ambiguous, name cannot %s" %
+                             (value, " and ".join(map(_describe, claimed))))
+
+        t = claimed[0]
+        stripped = _strip(t, value)
+        if is_number(stripped):
+            raise ValueError(
+                "`%s` is ambiguous because: `%s` can't be interpreted as %s"
+                % (value, stripped, t.kind))
+
+        return stripped, t
+
+    def _classify(self, match):
+        value, t = self._classify_value(match.value)
+        if t is None:
+            return match
+
+        payload = freeze_payload(_with_colbuilder(match.payload,
+                                                  t.colbuilder))
+        return Match._make(match.original, match.label, value, payload)
+
+    def transform_group(self, group):
+        """Transforms all the `Match` objects of a group at once
+
+        Args:
+            group: a list of `Match`, a `MatchGroup` or a `MatchChain`
+
+        Returns:
+            a sequence with the transformed `Match` objects, columnar groups
+            stay columnar and groups of ranges are returned as they are
+        """
+        if isinstance(group, MatchChain):
+            return MatchChain([self.transform_group(g) for g in group.groups])
+
+        if not (self.compiled and isinstance(group, MatchGroup)):
+            return [self.transform(match) for match in group]
+
+        values = group.originals if group.values is None else group.values
+        if isinstance(values, range):
+            # numbers are never transformed
+            return group
+
+        # runs of values claimed by the same transform share the payload
+        runs = []
+        start = 0
+        current = None
+        stripped = []
+        for i, value in enumerate(values):
+            value, t = self._classify_value(value)
+            if i and t is not current:
+                runs.append((start, i, current))
+                start = i
+            current = t
+            stripped.append(value)
+        runs.append((start, len(stripped), current))
+
+        groups = []
+        for start, stop, t in runs:
+            run = group[start:stop]
+            if t is not None:
+                run = run._replace(
+                    values=stripped[start:stop],
+                    payload=_with_colbuilder(group.payload, t.colbuilder))
+            groups.append(run)
+
+        return groups[0] if len(groups) == 1 else MatchChain(groups)
+
 
 class PropertyTransform(object):
+    prefix = "."
+    suffix = None
+    kind = "property"
+    colbuilder = staticmethod(builders.as_attribute)
+
     def transform(self, match):
         """Adds to the `Match` object `payload` the `default_colbuilder`: `colbuilders.as_attribute`
 
@@ -34,7 +187,7 @@ class PropertyTransform(object):
             match (Match): The `Match` object that is going to be enriched.
 
         Returns:
-            Match: The enriched `Match` object with a `default_colbuilder` key in the `payload`
+            Match: A new `Match` object with a `default_colbuilder` key in the `payload`
 
         Raises:
             ValueError: in case the `Match` value attribute is ambiguous.
@@ -57,13 +210,19 @@ class PropertyTransform(object):
                 % match.value)
 
         if match.value.startswith("."):
-            match.value = match.value[1:]
-            match.payload["default_colbuilder"] = builders.as_attribute
+            return match._replace(
+                value=match.value[1:],
+                payload=_with_colbuilder(match.payload, builders.as_attribute))
 
         return match
 
 
 class MethodTransform(object):
+    prefix = None
+    suffix = "!"
+    kind = "method"
+    colbuilder = staticmethod(builders.as_method)
+
     def transform(self, match):
         """Adds to the `Match` object `payload` the `default_colbuilder`: `colbuilders.as_method`
 
@@ -71,7 +230,7 @@ class MethodTransform(object):
             match (Match): The `Match` object that is going to be enriched.
 
         Returns:
-            Match: The enriched `Match` object with a `default_colbuilder` key in the `payload`
+            Match: A new `Match` object with a `default_colbuilder` key in the `payload`
 
         Raises:
             ValueError: in case the `Match` value attribute is ambiguous.
@@ -94,9 +253,10 @@ class MethodTransform(object):
                 % match.value)
 
         if match.value.endswith("!"):
-            match.value = match.value[:-1]
             # Maybe here we could catch methods whose arity is > 0
-            match.payload["default_colbuilder"] = builders.as_method
+            return match._replace(
+                value=match.value[:-1],
+                payload=_with_colbuilder(match.payload, builders.as_method))
 
         return match
 
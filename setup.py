@@ -12,7 +12,8 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = [
-    'pandas'
+    # Series.str.split(regex=...) is needed by colbuilders.split_expand
+    'pandas>=1.4'
 ]
 
 setup_requirements = [
@@ -3,12 +3,14 @@
 """Tests for `kodiak` package."""
 
 from collections import OrderedDict
+from itertools import product
 
 import pytest
 
 import kodiak.colbuilders as builders
 from kodiak.args_dict_builder import ArgsDictBuilder
-from kodiak.args_parser import Match
+from kodiak.args_parser import ArgsParser, Match
+from kodiak.transforms import default_transform
 
 adb = ArgsDictBuilder()
 
@@ -76,3 +78,22 @@ class TestArgsDictBuilder(object):
 
         with pytest.raises(ValueError):
             adb.build("foo_{.a!}")
+
+    def test_plan(self):
+        plan = ArgsDictBuilder(ArgsParser(), default_transform, product) \
+            .plan("f_{a,b}_{0:999}_{1:1000}_{.x,y!}")
+
+        assert len(plan) == 2 * 1000 * 1000 * 2
+        assert next(iter(plan)) == 'f_a_0_1_x'
+        assert 'f_b_10_999_y' in plan
+        assert 'f_b_10_1001_y' not in plan and 'f_c_1_1_x' not in plan
+        assert plan['f_b_10_999_y'] == (Match('b'), Match(10), Match(999),
+                                        Match('y!', value='y', payload={'default_colbuilder': builders.as_method}))
+        with pytest.raises(KeyError):
+            plan['f_b_10_999']
+
+        zipped = adb.plan("foo_{a,b}_{c,d}")
+        assert len(zipped) == 2
+        assert 'foo_a_d' not in zipped
+        assert zipped['foo_b_d'] == basic_fixture["foo_{a,b}_{c,d}"]['foo_b_d']
+        assert OrderedDict(zipped.items()) == basic_fixture["foo_{a,b}_{c,d}"]
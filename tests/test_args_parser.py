@@ -4,7 +4,7 @@
 
 import pytest
 
-from kodiak.args_parser import ArgsParser, Match
+from kodiak.args_parser import ArgsParser, Match, MatchChain, MatchGroup
 
 basic_fixture = {
     "foo": ('foo', [[Match(original=None, label=None, value=None,
@@ -92,3 +92,45 @@ class TestArgsParser(object):
     def test_mixed(self):
         for template, value in mixed_fixture.items():
             assert parser.parse(template) == value
+
+    def test_lazy_range(self):
+        template, (group, ) = parser.parse("foo_{a,0:1000000,k=v}")
+
+        assert template == 'foo_{}'
+        assert isinstance(group, MatchChain)
+        assert isinstance(group.groups[1], MatchGroup)
+        assert group.groups[1].originals == range(0, 1000001)
+        assert len(group) == 1000003
+        assert group[1000001] == Match(1000000)
+        assert group[-1] == Match(original='k=v', label='k', value='v')
+        assert group[:2] == [Match('a'), Match(0)]
+
+    def test_custom_pattern(self):
+        custom = ArgsParser(pattern='<(.*?)>', separator='|')
+
+        assert custom.parse("foo_<a|1:2>_{b}") == ('foo_{}_{b}', [[
+            Match('a'), Match(1), Match(2)]])
+
+    def test_error_position(self):
+        with pytest.raises(ValueError, match="group 1 `{1:a}` at position 8"):
+            parser.parse("foo_{b}_{1:a}")
+
+    def test_match_immutable(self):
+        match = Match('.a')
+
+        with pytest.raises(AttributeError):
+            match.value = 'a'
+
+        replaced = match._replace(value='a', payload={'k': 1})
+        assert match == Match('.a')
+        assert replaced == Match('.a', value='a', payload={'k': 1})
+        assert Match('b').payload is Match('c').payload
+
+    def test_match_group(self):
+        _, (group, ) = parser.parse("foo_{a,k=v,b}")
+
+        assert isinstance(group, MatchGroup)
+        assert group.values == ['a', 'v', 'b'] and group.labels == [None, 'k', None]
+        assert group[1:] == [Match('k=v', label='k', value='v'), Match('b')]
+        assert group[0].payload is group[2].payload
+        assert MatchGroup.from_matches(list(group)) == group
@@ -1,5 +1,9 @@
+import threading
+
 import pytest
+import kodiak
 import kodiak.config as config
+from kodiak.kodiak_dataframe import KodiakDataFrame
 
 
 class TestConfig(object):
@@ -31,3 +35,51 @@ class TestConfig(object):
 
         options = config.base_config(unpack=False)
         assert options["unpack"] == False
+
+    def test_restore_in_place(self):
+        options = config.options
+        options["unpack"] = False
+        config.restore_default_config()
+
+        assert config.options is options
+        assert options["unpack"] == True
+
+    def test_config_object(self):
+        frozen = config.Config(config.base_config(), drop=[1, {'a': [2]}])
+
+        assert hash(frozen) == hash(config.Config(frozen))
+        assert frozen == config.Config(frozen)
+        assert {frozen: 1}[config.Config(frozen)] == 1
+
+        replaced = frozen.replace(unpack=False)
+        assert replaced["unpack"] == False and frozen["unpack"] == True
+        assert replaced != frozen
+
+        with pytest.raises(TypeError):
+            frozen["unpack"] = False
+        with pytest.raises(KeyError):
+            frozen.replace(unknown_option=1)
+
+    def test_config_context(self):
+        assert config.current_config() is config.options
+
+        with kodiak.config_context(unpack=False) as outer:
+            assert config.current_config() is outer
+            with kodiak.config_context(drop=True):
+                assert config.current_config()["unpack"] == False
+                assert config.current_config()["drop"] == True
+            assert config.current_config()["drop"] == False
+
+            # other threads keep the global options
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(config.current_config()))
+            thread.start()
+            thread.join()
+            assert seen == [config.options]
+
+            df = KodiakDataFrame({'x': [1, 2]})
+            df.gencol("x_{1}", "x", lambda x, y: y)
+            assert df["x_1"].iloc[0] == (kodiak.args_parser.Match('1'), )
+
+        assert config.options["unpack"] == True
+        assert config.current_config() is config.options
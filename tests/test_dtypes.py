@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kodiak.config import cfg
+from kodiak.dtypes import compact
+from kodiak.kodiak_dataframe import KodiakDataFrame
+
+
+def make_frame():
+    return KodiakDataFrame({'born': pd.to_datetime(['1890-10-02', '1888-11-23', None]),
+                            'age': [10, 20, 30]})
+
+
+class TestDtypes(object):
+    def test_dtype(self):
+        df = make_frame()
+        df.gencol("age_{1,2}", "age", lambda x, y: x * int(y), dtype='int16')
+        df.gencol("age_{big,small}", "age", lambda x, y: x > 15 if y == 'big' else None,
+                  dtype={'age_big': bool, 'age_small': 'float32'})
+        df.gencol("born_{.month,.year}", "born", dtype='int16')
+        df.gencol("born_{day}", "born", lambda x, y: getattr(x, y), dtype='uint8',
+                  config=cfg(memoize=True))
+        df.mutcol("age", lambda x, y: x if x < 25 else None, dtype='int8')
+
+        assert df.dtypes.astype(str).to_dict() == {
+            'born': 'datetime64[ns]', 'age': 'Int8', 'age_1': 'int16', 'age_2': 'int16',
+            'age_big': 'bool', 'age_small': 'float32', 'born_month': 'Int16', 'born_year': 'Int16',
+            'born_day': 'UInt8'}
+        assert df["age"].tolist() == [10, 20, pd.NA]
+        assert df["born_day"].tolist() == [2, 23, pd.NA]
+
+        with pytest.raises(ValueError):
+            df.gencol("age_{1,2}", "age", lambda x, y: x, dtype={'age_3': 'int8'})
+
+    @pytest.mark.parametrize('func, dtype', [
+        (lambda x, y: x * 30, 'int8'),
+        (lambda x, y: x + 0.5, 'int32'),
+        (lambda x, y: -x, 'uint64'),
+        (lambda x, y: x * 30 if x < 30 else None, 'int8'),
+    ])
+    def test_dtype_unsafe_cast(self, func, dtype):
+        df = make_frame()
+        with pytest.raises(TypeError):
+            df.gencol("age_{x}", "age", func, dtype=dtype)
+
+        df.gencol("age_{x}", "age", lambda x, y: x * 4.0, dtype=dtype.replace('uint', 'int'))
+        assert df["age_x"].tolist() == [40, 80, 120]
+
+    def test_infer_compact(self):
+        df = make_frame()
+        df.gencol("born_{.month,.year}", "born", dtype='infer-compact')
+        df.gencol("age_{1,1000}", "age", lambda x, y: x * int(y), dtype='infer-compact')
+        df.gencol("age_{odd}", "age", lambda x, y: None if x > 20 else x % 2 == 1,
+                  dtype='infer-compact', config=cfg(executor='thread', chunksize=1))
+
+        assert df.dtypes.astype(str).to_dict() == {
+            'born': 'datetime64[ns]', 'age': 'int64', 'born_month': 'Int8', 'born_year': 'Int16',
+            'age_1': 'int8', 'age_1000': 'int16', 'age_odd': 'boolean'}
+
+    def test_compact(self):
+        assert compact(pd.Series([1.5, np.nan])).dtype == np.float64
+        assert compact(pd.Series([1, None], dtype=object)).dtype == 'Int8'
+        assert compact(pd.Series(['a', None])).dtype == object
+        assert compact(pd.Series([2 ** 40])).dtype == np.int64
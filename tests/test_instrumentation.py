@@ -0,0 +1,47 @@
+from __future__ import absolute_import
+
+import logging
+
+import pandas as pd
+
+import kodiak
+from kodiak.config import cfg
+from kodiak.instrumentation import LoggingSink, StatsCollector
+from kodiak.kodiak_dataframe import KodiakDataFrame
+
+
+def make_frame():
+    return KodiakDataFrame({'born': pd.to_datetime(['1890-10-02', '1888-11-23', '1890-10-02']),
+                            'name': ['Groucho', 'Harpo', 'Groucho']})
+
+
+class TestInstrumentation(object):
+    def test_instrument(self):
+        df = make_frame()
+
+        with kodiak.instrument() as stats:
+            df.gencol("born_{.year,isoweekday!}", "born")
+            df.gencol("name_{1}", "name", lambda x, y: x + y, config=cfg(memoize=True))
+
+        df.gencol("name_{2}", "name", lambda x, y: x + y)
+
+        records = stats.to_frame().set_index('name')
+        assert records.index.tolist() == ['born_year', 'born_isoweekday', 'name_1']
+        assert records['path'].tolist() == ['accessor', 'per-row', 'memoized']
+        assert records['calls'].tolist() == [0, 3, 2]
+        assert records['rows'].tolist() == [3, 3, 3]
+        assert (records['memory'] > 0).all()
+        assert (records['seconds'] >= 0).all()
+
+    def test_config_sink(self, caplog):
+        collector = StatsCollector()
+        df = make_frame()
+        df.gencol("name_{a,b}", "name", kodiak.colbuilders.vectorized(lambda s, y: s + y),
+                  config=cfg(instrument=collector))
+
+        assert [r.path for r in collector.records] == ['vectorized', 'vectorized']
+        assert [r.calls for r in collector.records] == [1, 1]
+
+        with caplog.at_level(logging.INFO, logger='kodiak'):
+            df.gencol("name_{c}", "name", lambda x, y: x, config=cfg(instrument=LoggingSink()))
+        assert "name_c from name: per-row path" in caplog.text
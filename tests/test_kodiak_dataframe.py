@@ -1,15 +1,29 @@
 from __future__ import absolute_import
 
 from kodiak.kodiak_dataframe import KodiakDataFrame
-from kodiak.colbuilders import splitter
+from kodiak.colbuilders import extract, lag, lead, rolling, split_expand, splitter, vectorized
+from kodiak.config import cfg
 
+import datetime
+import re
+import warnings
+from decimal import Decimal
+from itertools import product
+
+import numpy as np
 import pandas as pd
+import pytest
+from pandas.errors import PerformanceWarning
 
 kdf = KodiakDataFrame({'name': ['Groucho Marx', 'Harpo Marx'],
                        'born': pd.to_datetime(['02-10-1890', '23-11-1888']),
                        'birthplace': ['United States,New York', 'United States,New York']})
 
 
+def repeat(x, y):
+    return x * int(y)
+
+
 class TestKodiakDataFrame(object):
     def test_default_colbuilder(self):
         kdf.gencol("born_{.year,.month}", "born")
@@ -34,3 +48,360 @@ class TestKodiakDataFrame(object):
 
         assert kdf["birthplace_country"].values.tolist() == ['United States', 'United States']
         assert kdf["birthplace_state"].values.tolist() == ['New York', 'New York']
+
+    def test_default_colbuilder_accessor(self):
+        df = KodiakDataFrame({'born': pd.to_datetime(['1890-10-02', '1888-11-23']),
+                              'name': ['Groucho', 'Harpo']})
+        df.gencol("born_{.day,day_name!}", "born")
+        df.gencol("name_{upper!}", "name")
+
+        assert df["born_day"].values.tolist() == [2, 23]
+        assert df["born_day_name"].values.tolist() == ['Thursday', 'Friday']
+        assert df["name_upper"].values.tolist() == ['GROUCHO', 'HARPO']
+
+        # methods without an accessor counterpart fall back to a per row call
+        df.gencol("born_{isoweekday!}", "born")
+        assert df["born_isoweekday"].values.tolist() == [4, 5]
+
+        # and so do accessor methods that need arguments
+        df.gencol("name_{encode!}", "name")
+        assert df["name_encode"].values.tolist() == [b'Groucho', b'Harpo']
+
+    def test_default_colbuilder_accessor_non_strings(self):
+        class Name(object):
+            def __init__(self, value):
+                self.value = value
+
+            def upper(self):
+                return self.value.upper()
+
+        df = KodiakDataFrame({'raw': [b'Groucho', b'Harpo'],
+                              'mixed': ['Groucho', b'Harpo'],
+                              'name': [Name('Groucho'), Name('Harpo')]})
+        df.gencol("raw_{decode!,lower!}", "raw")
+        df.gencol("mixed_{lower!}", "mixed")
+        df.gencol("name_{upper!}", "name")
+
+        assert df["raw_decode"].values.tolist() == ['Groucho', 'Harpo']
+        assert df["raw_lower"].values.tolist() == [b'groucho', b'harpo']
+        assert df["mixed_lower"].values.tolist() == ['groucho', b'harpo']
+        assert df["name_upper"].values.tolist() == ['GROUCHO', 'HARPO']
+
+    def test_wide_expansion(self):
+        df = KodiakDataFrame({'x': [1, 2, 3], 'y': [4, 5, 6]})
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", PerformanceWarning)
+            df.gencol("x_{0:299}", "x", lambda x, y: x * y, drop=True)
+
+        assert df.shape == (3, 301)
+        assert df.columns[:3].tolist() == ['y', 'x_0', 'x_1']
+        assert df["x_299"].values.tolist() == [299, 598, 897]
+
+    def test_mutcol_keeps_position(self):
+        df = KodiakDataFrame({'x': [1, 2], 'y': [3, 4]})
+        df.mutcol("x", lambda x, y: x * 10)
+
+        assert df.columns.tolist() == ['x', 'y']
+        assert df["x"].values.tolist() == [10, 20]
+
+    def test_memoize(self):
+        calls = []
+
+        def colbuilder(x, y):
+            calls.append(x)
+            return "%s_%s" % (x, y)
+
+        df = KodiakDataFrame({'country': ['ar', 'br', None, 'ar', 'br', 'ar']})
+        df.gencol("country_{a,b}", "country", colbuilder, config=cfg(memoize=True))
+
+        assert df["country_a"].values.tolist() == ['ar_a', 'br_a', 'None_a', 'ar_a', 'br_a', 'ar_a']
+        assert df["country_b"].values.tolist() == ['ar_b', 'br_b', 'None_b', 'ar_b', 'br_b', 'ar_b']
+        assert len(calls) == 6
+
+        # over the ratio every row is passed to the colbuilder
+        del calls[:]
+        df.gencol("country_{c}", "country", colbuilder, config=cfg(memoize=0.1))
+        assert len(calls) == 6
+
+    def test_memoize_mixed_types(self):
+        df = KodiakDataFrame({'value': pd.Series([1, True, 1.0], dtype=object)})
+        df.gencol("value_{type}", "value", lambda x, y: type(x).__name__, config=cfg(memoize=True))
+
+        assert df["value_type"].values.tolist() == ['int', 'bool', 'float']
+
+    def test_memoize_decided_once_per_source(self, monkeypatch):
+        import kodiak.engine
+        calls = []
+
+        def infer_dtype(values, skipna=False):
+            calls.append(values)
+            return pd.api.types.infer_dtype(values, skipna=skipna)
+
+        monkeypatch.setattr(kodiak.engine, 'infer_dtype', infer_dtype)
+        df = KodiakDataFrame({'value': pd.Series([1, True, 1.0, 'a'], dtype=object)})
+        df.gencol("value_{a,b,c}", "value", lambda x, y: y, config=cfg(memoize=True))
+
+        assert df["value_c"].values.tolist() == ['c'] * 4
+        assert len(calls) == 1
+
+    def test_memoize_categorical(self):
+        df = KodiakDataFrame({'country': pd.Categorical(['ar', 'br', 'ar'], categories=['br', 'ar', 'cl'])})
+        df.gencol("country_{upper}", "country", lambda x, y: getattr(x, y)(), config=cfg(memoize=True))
+
+        assert df["country_upper"].values.tolist() == ['AR', 'BR', 'AR']
+
+    def test_vectorized_colbuilder(self):
+        df = KodiakDataFrame({'sales': [1, 2, 3]})
+        df.gencol("sales_lag_{1:2}", "sales", vectorized(lambda s, k: s.shift(k)))
+        df.gencol("sales_{x=2}", "sales", lambda s, k: s * int(k), config=cfg(vectorized=True))
+        df.gencol("sales_{a,b}", "sales", vectorized(lambda i, s, k: s + i), enum=True)
+        df.mutcol("sales", vectorized(lambda s, k: s * 10))
+
+        assert df["sales_lag_1"].values.tolist()[1:] == [1, 2]
+        assert df["sales_lag_2"].values.tolist()[2:] == [1]
+        assert df["sales_x"].values.tolist() == [2, 4, 6]
+        assert df["sales_b"].values.tolist() == [2, 3, 4]
+        assert df["sales"].values.tolist() == [10, 20, 30]
+
+    def test_vectorized_callables(self):
+        class Scaler(object):
+            def scale(self, s, k):
+                return s * int(k)
+
+        df = KodiakDataFrame({'sales': [1, 2, 3]})
+        df.gencol("sales_plus_{1:2}", "sales", vectorized(np.add))
+        df.gencol("sales_scaled_{10}", "sales", vectorized(Scaler().scale))
+        df.gencol("sales_log_{1,10}", "sales", vectorized(lambda s, k: np.log1p(s) * int(k)))
+
+        assert df["sales_plus_2"].values.tolist() == [3, 4, 5]
+        assert df["sales_scaled_10"].values.tolist() == [10, 20, 30]
+        assert df["sales_log_10"].values.tolist() == (np.log1p([1, 2, 3]) * 10).tolist()
+
+    def test_parallel(self):
+        df = KodiakDataFrame({'name': ['ab', 'cd', 'ef', 'gh', 'ij']}, index=[4, 3, 2, 1, 0])
+        df.gencol("name_{1,2}", "name", repeat, config=cfg(executor='process', n_jobs=2, chunksize=2))
+        df.gencol("{first,last}_letter", "name", lambda i, x, y: x[i], config=cfg(executor='thread', chunksize=1))
+
+        assert df.columns.tolist() == ['name', 'name_1', 'name_2', 'first_letter', 'last_letter']
+        assert df.index.tolist() == [4, 3, 2, 1, 0]
+        assert df["name_2"].values.tolist() == ['abab', 'cdcd', 'efef', 'ghgh', 'ijij']
+        assert df["last_letter"].values.tolist() == ['b', 'd', 'f', 'h', 'j']
+
+        with pytest.raises(ValueError):
+            df.gencol("name_{3}", "name", lambda x, y: x, config=cfg(executor='process'))
+
+    def test_sparse_output(self):
+        df = KodiakDataFrame({'country': ['ar', 'br', 'ar', 'cl']})
+        df.gencol("is_{ar,br,cl,uy}", "country", lambda x, y: x == y, config=cfg(output='sparse'))
+        df.gencol("code_{ar}", "country", lambda x, y: 7 if x == y else -1,
+                  config=cfg(output='sparse', fill_value=-1))
+
+        assert str(df["is_ar"].dtype) == 'Sparse[bool, False]'
+        assert df["is_ar"].sparse.density == 0.5
+        assert df["is_uy"].sparse.density == 0
+        assert df["is_br"].values.tolist() == [False, True, False, False]
+        assert df["code_ar"].sparse.fill_value == -1
+        assert df["code_ar"].values.tolist() == [7, -1, 7, -1]
+
+    def test_category_output(self):
+        df = KodiakDataFrame({'country': ['ar', 'br', 'ar', 'cl']})
+        df.gencol("is_{ar,br,uy}", "country", lambda x, y: x == y, config=cfg(output='category'))
+        df.gencol("{ar,cl}_flag", "country", lambda x, y: x == y,
+                  config=cfg(output='category', category_name='flag_country'))
+
+        assert df.columns.tolist() == ['country', 'is', 'flag_country']
+        assert df["is"].cat.categories.tolist() == ['ar', 'br', 'uy']
+        assert df["is"].tolist()[:3] == ['ar', 'br', 'ar']
+        assert pd.isnull(df["is"].iloc[3])
+        assert df["flag_country"].tolist()[2:] == ['ar', 'cl']
+
+        with pytest.raises(ValueError):
+            df.gencol("is_{ar,a}", "country", lambda x, y: x.startswith(y), config=cfg(output='category'))
+
+    def test_window_colbuilders(self):
+        df = KodiakDataFrame({'sales': [1., 2., 3., 4., 5.], 'store': ['a', 'b', 'a', 'b', 'a']},
+                             index=[10, 20, 30, 40, 50])
+        df.gencol("sales_lag_{1:2}", "sales", lag())
+        df.gencol("sales_lead_{1}", "sales", lead(by='store'))
+        df.gencol("sales_roll_{2}", "sales", rolling('sum'))
+        df.gencol("sales_roll_{mean,max}_{2,3}", "sales", rolling(by='store', min_periods=1),
+                  config=cfg(new_col_combiner=product))
+
+        assert df["sales_lag_2"].tolist()[2:] == [1., 2., 3.]
+        assert df["sales_lead_1"].tolist()[:3] == [3., 4., 5.]
+        assert df["sales_roll_2"].tolist()[1:] == [3., 5., 7., 9.]
+        assert df["sales_roll_mean_2"].tolist() == [1., 2., 2., 3., 4.]
+        assert df["sales_roll_max_3"].tolist() == [1., 2., 3., 4., 5.]
+        assert df["sales_roll_mean_3"].tolist() == [1., 2., 2., 3., 3.]
+
+    def test_window_colbuilders_no_unpack(self):
+        df = KodiakDataFrame({'sales': [1., 2., 3., 4., 5.], 'store': ['a', 'b', 'a', 'b', 'a']})
+        no_unpack = cfg(unpack=False)
+        df.gencol("sales_lag_{1}", "sales", lag(), config=no_unpack)
+        df.gencol("sales_lead_{1}", "sales", lead(by='store'), config=no_unpack)
+        df.gencol("sales_roll_{2}", "sales", rolling('sum'), config=no_unpack)
+        df.gencol("sales_roll_{max}_{3}", "sales", rolling(by='store', min_periods=1),
+                  config=cfg(unpack=False, new_col_combiner=product))
+
+        assert df["sales_lag_1"].tolist()[1:] == [1., 2., 3., 4.]
+        assert df["sales_lead_1"].tolist()[:3] == [3., 4., 5.]
+        assert df["sales_roll_2"].tolist()[1:] == [3., 5., 7., 9.]
+        assert df["sales_roll_max_3"].tolist() == [1., 2., 3., 4., 5.]
+
+    def test_window_colbuilders_missing_key(self):
+        df = KodiakDataFrame({'sales': [1., 2., 3., 4., 5.], 'store': ['a', None, 'a', 'b', 'b']},
+                             index=[10, 20, 30, 40, 50])
+        df.gencol("sales_roll_{2}", "sales", rolling('sum', by='store', min_periods=1))
+        df.gencol("sales_lag_{1}", "sales", lag(by='store'))
+
+        assert df["sales_roll_2"].tolist()[2:] == [4., 4., 9.]
+        assert df["sales_roll_2"].iloc[0] == 1.
+        assert pd.isnull(df["sales_roll_2"].iloc[1])
+        assert pd.isnull(df["sales_lag_1"].iloc[1])
+        assert df["sales_lag_1"].tolist()[2] == 1.
+
+    def test_window_colbuilders_na_action(self):
+        df = KodiakDataFrame({'s': [1., None, 3., 4., 5.], 'k': ['a', 'a', 'b', 'a', 'b']},
+                             index=[10, 20, 30, 40, 50])
+        df.gencol("s_roll_{2}", "s", rolling('sum', by='k', min_periods=1), na_action='ignore')
+        df.gencol("s_lag_{1}", "s", lag(by='k'), na_action='ignore')
+
+        assert df["s_roll_2"].tolist()[2:] == [3., 5., 8.]
+        assert df["s_roll_2"].iloc[0] == 1.
+        assert pd.isnull(df["s_roll_2"].iloc[1])
+        assert df["s_lag_1"].tolist()[3:] == [1., 3.]
+
+    def test_gengroupcol(self):
+        df = KodiakDataFrame({'user': ['a', 'b', 'a', None, 'b'], 'day': [1, 1, 1, 1, 2],
+                              'amount': [1., 2., 3., 4., 6.]})
+        df.gengroupcol("amount_{mean,sum,max,count,avg=mean}", "amount", by="user")
+        df.gengroupcol("amount_day_{sum}", "amount", by=["user", "day"])
+
+        assert df["amount_mean"].tolist()[:3] == [2., 4., 2.]
+        assert df["amount_avg"].tolist()[:3] == [2., 4., 2.]
+        assert df["amount_sum"].tolist()[:3] == [4., 8., 4.]
+        assert df["amount_max"].tolist()[4] == 6.
+        assert df["amount_count"].tolist()[:3] == [2, 2, 2]
+        assert pd.isnull(df["amount_count"].iloc[3])
+        assert df["amount_day_sum"].tolist()[:3] == [4., 2., 4.]
+        assert df["amount_day_sum"].iloc[4] == 6.
+
+    def test_split_expand(self):
+        df = KodiakDataFrame({'name': ['Groucho Marx', 'Karl Heinrich  Marx', 'Chico', None]})
+        df.gencol("{first,middle,last}_name", "name", split_expand(r"\s+", regex=True))
+        df.gencol("{given,rest}", "name", splitter(" ", maxsplit=1))
+
+        assert df["first_name"].tolist()[:3] == ['Groucho', 'Karl', 'Chico']
+        assert df["middle_name"].tolist()[:3] == ['Marx', 'Heinrich', None]
+        assert df["last_name"].tolist()[:3] == [None, 'Marx', None]
+        assert df["first_name"].isnull().iloc[3]
+        assert df["rest"].tolist()[:3] == ['Marx', 'Heinrich  Marx', None]
+
+        # compiled patterns are always regular expressions
+        df.gencol("{x,y}_piece", "name", split_expand(re.compile(r"\s+"), 1))
+        assert df["y_piece"].tolist()[:2] == ['Marx', 'Heinrich  Marx']
+
+    def test_extract(self):
+        df = KodiakDataFrame({'line': ['web1 /index 200', 'web2 /login 404', 'garbage']})
+        pattern = r'(?P<host>\S+) (?P<path>\S+) (?P<status>\d+)'
+        df.gencol("{host,url=path,status}", "line", extract(pattern, dtypes={'status': int}))
+
+        assert df["host"].tolist()[:2] == ['web1', 'web2']
+        assert df["url"].tolist()[:2] == ['/index', '/login']
+        assert df["status"].dtype == 'Int64'
+        assert df["status"].tolist()[:2] == [200, 404]
+        assert df["host"].isnull().iloc[2] and df["status"].isnull().iloc[2]
+
+        with pytest.raises(ValueError):
+            df.gencol("{host,port}", "line", extract(pattern))
+        with pytest.raises(ValueError):
+            extract(pattern, dtypes={'port': int})
+
+    def test_default_colbuilder_fused(self):
+        class Order(object):
+            def __init__(self, date, amount):
+                self.date, self.amount = date, amount
+
+        df = KodiakDataFrame({'order': [Order(datetime.date(2020, 1, 31), Decimal('1.5')),
+                                        Order(datetime.date(2021, 6, 1), Decimal('-2'))]})
+        df.gencol("order_{.date.year,.date.month,amount.is_signed!}", "order")
+        df.gencol("order_{.amount}", "order", dtype={'order_amount': float})
+
+        assert df["order_date.year"].tolist() == [2020, 2021]
+        assert df["order_date.month"].tolist() == [1, 6]
+        assert df["order_amount.is_signed"].tolist() == [False, True]
+        assert df["order_amount"].tolist() == [1.5, -2.]
+
+    def test_pre(self):
+        df = KodiakDataFrame({'ts': ['2020-01-31 10:00', '2021-06-01 23:30', None],
+                              'amount': ['1.5', '2', 'x'],
+                              'doc': ['{"a": 1}', '{"a": 2}', '{"a": 1}']})
+        df.gencol("ts_{.hour,.month}", "ts", pre='datetime')
+        df.gencol("amount_{2}", "amount", lambda x, y: x * int(y),
+                  pre=lambda s: pd.to_numeric(s, errors='coerce'))
+        df.gencol("doc_{a}", "doc", lambda x, y: x[y], pre='json')
+
+        assert df["ts_hour"].tolist()[:2] == [10, 23]
+        assert df["ts_month"].tolist()[:2] == [1, 6]
+        assert df["amount_2"].tolist()[:2] == [3., 4.]
+        assert pd.isnull(df["amount_2"].iloc[2])
+        assert df["doc_a"].tolist() == [1, 2, 1]
+        assert df["ts"].tolist()[0] == '2020-01-31 10:00'
+
+        with pytest.raises(ValueError):
+            df.gencol("ts_{.hour}", "ts", pre='date')
+
+    def test_na_action(self):
+        calls = []
+
+        def double(x, y):
+            calls.append(x)
+            return x * 2
+
+        df = KodiakDataFrame({'name': ['a', None, 'b', None, 'a'],
+                              'age': [1, None, 3, None, 1]})
+        df.gencol("name_ignore", "name", double, na_action='ignore')
+        df.gencol("name_fill", "name", double, na_action='?')
+        df.gencol("name_memo", "name", double, na_action='ignore', config=cfg(memoize=True))
+        df.gencol("age_{2}", "age", lambda x, y: x * int(y), na_action=0, dtype=int)
+        df.mutcol("name", lambda x, y: x.upper(), na_action='propagate')
+
+        assert calls == ['a', 'b', 'a'] * 2 + ['a', 'b']
+        assert df["name_ignore"].tolist()[::2] == ['aa', 'bb', 'aa']
+        assert df["name_ignore"].isnull().tolist() == [False, True, False, True, False]
+        assert df["name_fill"].tolist() == ['aa', '?', 'bb', '?', 'aa']
+        assert df["name_memo"].tolist() == df["name_ignore"].tolist()
+        assert df["age_2"].dtype == 'int64'
+        assert df["age_2"].tolist() == [2, 0, 6, 0, 2]
+        assert df["name"].tolist() == ['A', None, 'B', None, 'A']
+
+    def test_na_action_dtype(self):
+        # the example of the README
+        visits = KodiakDataFrame({'clicks': [3, None, 1]})
+        visits.gencol("clicks_{2}", "clicks", lambda x, y: x * int(y), na_action=0, dtype=int)
+
+        assert visits["clicks_2"].dtype == 'int64'
+        assert visits["clicks_2"].tolist() == [6, 0, 2]
+
+    def test_column_batch(self):
+        eager = KodiakDataFrame({'x': [1, 2]})
+        eager.gencol("x_{1:3}_{a,bb}", "x", lambda x, y: x * y[0] * len(y[1]),
+                     config=cfg(new_col_combiner=product))
+
+        df = KodiakDataFrame({'x': [1, 2]})
+        df.gencol("x_{1:3}_{a,bb}", "x", lambda x, y: x * y[0] * len(y[1]),
+                  config=cfg(new_col_combiner=product, column_batch=4))
+        df.gencol("x", "x", lambda x, y: -x, config=cfg(column_batch=4))
+
+        assert df.columns.tolist() == eager.columns.tolist()
+        assert df.drop(columns="x").values.tolist() == eager.drop(columns="x").values.tolist()
+        assert df["x_3_bb"].tolist() == [6, 12]
+        assert df["x"].tolist() == [-1, -2]
+
+    def test_column_batch_batch_colbuilder(self):
+        df = KodiakDataFrame({'code': ['a b c d', 'e f g h']})
+        df.gencol("{p,q,r,s}", "code", splitter(" "), config=cfg(column_batch=2))
+
+        assert df["r"].tolist() == ['c', 'g']
+        assert df["s"].tolist() == ['d', 'h']
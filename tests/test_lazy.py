@@ -0,0 +1,116 @@
+from __future__ import absolute_import
+
+import pytest
+
+from kodiak.config import cfg
+from kodiak.kodiak_dataframe import KodiakDataFrame
+
+
+def make_frame():
+    return KodiakDataFrame({'name': ['groucho marx', 'harpo marx'], 'age': [1, 2]})
+
+
+class TestLazyFrame(object):
+    def test_same_as_eager(self):
+        eager = make_frame()
+        eager.gencol("name_{upper!}", "name")
+        eager.mutcol("name", lambda x, y: x.title())
+        eager.gencol("{first,last}_name", "name", lambda i, x, y: x.split(" ")[i])
+        eager.gencol("age_{1:2}", "age", lambda x, y: x * y, drop=True)
+        eager.gencol("age", "age_2", lambda x, y: x)
+
+        lazy = make_frame()
+        result = lazy.lazy() \
+            .gencol("name_{upper!}", "name") \
+            .mutcol("name", lambda x, y: x.title()) \
+            .gencol("{first,last}_name", "name", lambda i, x, y: x.split(" ")[i]) \
+            .gencol("age_{1:2}", "age", lambda x, y: x * y, drop=True) \
+            .gencol("age", "age_2", lambda x, y: x) \
+            .collect()
+
+        assert result is lazy
+        assert lazy.columns.tolist() == eager.columns.tolist()
+        assert lazy.values.tolist() == eager.values.tolist()
+        assert lazy["name_upper"].values.tolist() == ['GROUCHO MARX', 'HARPO MARX']
+        assert lazy["first_name"].values.tolist() == ['Groucho', 'Harpo']
+
+    def test_shared_source(self):
+        calls = []
+
+        def colbuilder(x, y):
+            calls.append(x)
+            return x + y
+
+        df = KodiakDataFrame({'x': ['a', 'a', 'b']})
+        df.lazy() \
+            .gencol("x_{1}", "x", colbuilder, config=cfg(memoize=True)) \
+            .gencol("x_{2}", "x", colbuilder, config=cfg(memoize=True)) \
+            .collect()
+
+        assert df["x_2"].values.tolist() == ['a2', 'a2', 'b2']
+        assert len(calls) == 4
+
+    def test_errors(self):
+        df = make_frame()
+
+        with pytest.raises(ValueError):
+            df.lazy().gencol("{first,last}_name", "name", enum=True)
+
+        with pytest.raises(KeyError):
+            df.lazy().gencol("lower", "name", lambda x, y: x, drop=True) \
+                .gencol("upper", "name", lambda x, y: x).collect()
+
+        assert df.columns.tolist() == ['name', 'age']
+
+    def test_shared_pre(self):
+        calls = []
+
+        def parse(s):
+            calls.append(len(s))
+            return s.str.upper()
+
+        df = make_frame()
+        df.lazy() \
+            .gencol("name_{1}", "name", lambda x, y: x[:int(y)], pre=parse) \
+            .gencol("name_{len!}", "name", lambda x, y: len(x), pre=parse) \
+            .mutcol("name", pre=parse, colbuilder=lambda x, y: x[::-1]) \
+            .gencol("name_last", "name", lambda x, y: x[0], pre=parse) \
+            .collect()
+
+        # converted once before and once after mutating the column
+        assert calls == [2, 2]
+        assert df["name_1"].tolist() == ['G', 'H']
+        assert df["name_last"].tolist() == ['X', 'X']
+
+    def test_gencol_many(self):
+        eager = make_frame()
+        eager.gencol("name_{upper!}", "name")
+        eager.gencol("{first,last}_name", "name", lambda i, x, y: x.split(" ")[i])
+        eager.mutcol("age", lambda x, y: x * 10)
+
+        df = make_frame()
+        result = df.gencol_many([
+            ("name_{upper!}", "name"),
+            {'newcols': "{first,last}_name", 'col': "name",
+             'colbuilder': lambda i, x, y: x.split(" ")[i]},
+        ])
+        df.mutcol_many([("age", lambda x, y: x * 10)])
+
+        assert result is df
+        assert df.columns.tolist() == eager.columns.tolist()
+        assert df.values.tolist() == eager.values.tolist()
+
+    def test_gencol_many_errors(self):
+        df = make_frame()
+
+        with pytest.raises(ValueError, match="spec 1"):
+            df.gencol_many([("name_{upper!}", "name"), ("{a,b}", "name", None, None, True)])
+
+        with pytest.raises(ValueError, match="`name_upper` \\(specs 0, 2\\)"):
+            df.gencol_many([("name_{upper!}", "name"), ("age_{1}", "age", lambda x, y: x),
+                            ("name_upper", "name", lambda x, y: x)])
+
+        with pytest.raises(ValueError, match="`age`"):
+            df.mutcol_many([("age", lambda x, y: x), ("age", lambda x, y: x)])
+
+        assert df.columns.tolist() == ['name', 'age']
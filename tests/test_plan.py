@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+
+from itertools import product
+
+import pandas as pd
+import pytest
+
+import kodiak
+from kodiak.config import cfg
+from kodiak.kodiak_dataframe import KodiakDataFrame
+from kodiak.plan import LRUCache, template_cache
+
+
+class TestPlan(object):
+    def test_compile(self):
+        plan = kodiak.compile("born_{.year,.month}", "born", drop=True)
+        assert list(plan.args) == ['born_year', 'born_month']
+
+        for dates in (['1890-10-02', '1888-11-23'], ['1901-01-01']):
+            df = pd.DataFrame({'born': pd.to_datetime(dates)})
+            assert plan.apply(df) is df
+            assert df.columns.tolist() == ['born_year', 'born_month']
+
+        assert df["born_year"].values.tolist() == [1901]
+
+        with pytest.raises(ValueError):
+            kodiak.compile("{first,last}_name", "name", enum=True)
+
+    def test_template_cache(self):
+        template_cache.clear()
+        df = KodiakDataFrame({'x': [1, 2]})
+
+        df.gencol("x_{1:3}", "x", lambda x, y: x * y)
+        df.gencol("x_{1:3}", "x", lambda x, y: x + y)
+        assert len(template_cache) == 1
+
+        df.gencol("x_{1:3}", "x", lambda x, y: x + y, config=cfg(memoize=True))
+        assert len(template_cache) == 2
+        assert df["x_3"].values.tolist() == [4, 5]
+
+        # every cfg call builds its own parser, equal parsers share the plan
+        df.gencol("x_{1:3}", "x", lambda x, y: x * y, config=cfg(memoize=True))
+        df.gencol("x_{1:3}", "x", lambda x, y: x * y, config=cfg())
+        assert len(template_cache) == 2
+
+    def test_column_batch_is_lazy(self):
+        combined = []
+
+        def counting_product(*groups):
+            for arg in product(*groups):
+                combined.append(arg)
+                yield arg
+
+        plan = kodiak.compile("f_{0:999}_{0:999}", "x", lambda x, y: x,
+                              config=cfg(new_col_combiner=counting_product,
+                                         column_batch=10))
+        batch = next(plan.batches())
+
+        assert list(batch) == ['f_0_%d' % i for i in range(10)]
+        assert len(combined) <= 11
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
@@ -0,0 +1,73 @@
+from __future__ import absolute_import
+
+import pandas as pd
+import pytest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import kodiak
+
+CSV = """name,age
+groucho marx,1
+harpo marx,2
+chico marx,3
+"""
+
+
+def make_stream():
+    return kodiak.stream(pd.read_csv(StringIO(CSV), chunksize=2)) \
+        .mutcol("name", lambda x, y: x.title()) \
+        .gencol("{first,last}_name", "name", lambda i, x, y: x.split(" ")[i]) \
+        .gencol("age_{2}", "age", lambda x, y: x * int(y), drop=True)
+
+
+class TestStream(object):
+    def test_iter(self):
+        chunks = list(make_stream())
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert isinstance(chunks[0], kodiak.KodiakDataFrame)
+        assert chunks[1].to_dict('records') == [
+            {'name': 'Chico Marx', 'first_name': 'Chico', 'last_name': 'Marx', 'age_2': 6}]
+
+    def test_to_csv(self):
+        out = StringIO()
+        make_stream().to_csv(out, index=False)
+
+        assert out.getvalue().splitlines() == [
+            'name,first_name,last_name,age_2',
+            'Groucho Marx,Groucho,Marx,2',
+            'Harpo Marx,Harpo,Marx,4',
+            'Chico Marx,Chico,Marx,6']
+
+    def test_to_parquet(self, tmpdir):
+        pytest.importorskip("pyarrow")
+        path = str(tmpdir.join("out.parquet"))
+        make_stream().to_parquet(path, index=False)
+
+        assert pd.read_parquet(path)["age_2"].values.tolist() == [2, 4, 6]
+
+    def test_to_parquet_schema_changes(self, tmpdir):
+        pytest.importorskip("pyarrow")
+        chunks = [pd.DataFrame({'x': [1, 2], 'note': [None, None]}),
+                  pd.DataFrame({'x': [3, 200], 'note': ['a', None]}, index=[5, 6]),
+                  pd.DataFrame({'x': [4, 5], 'note': [None, 'b']}, index=[7, 8])]
+        path = str(tmpdir.join("out.parquet"))
+        kodiak.stream(iter(chunks)) \
+            .gencol("x_{2}", "x", lambda x, y: x * int(y), dtype='infer-compact') \
+            .to_parquet(path)
+
+        out = pd.read_parquet(path)
+        assert out["x_2"].tolist() == [2, 4, 6, 400, 8, 10]
+        assert out["note"].tolist() == [None, None, 'a', None, None, 'b']
+        assert str(out["x_2"].dtype) == 'int16'
+
+        # a type larger than the one already written can't be promoted
+        chunks = [pd.DataFrame({'x': [1, 2]}), pd.DataFrame({'x': [300, 400]})]
+        with pytest.raises(ValueError, match="x_2: int16"):
+            kodiak.stream(iter(chunks)) \
+                .gencol("x_{2}", "x", lambda x, y: x * int(y), dtype='infer-compact') \
+                .to_parquet(path)
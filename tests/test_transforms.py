@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+
+import pytest
+
+from kodiak.args_parser import ArgsParser, Match, MatchChain, MatchGroup
+from kodiak.colbuilders import as_attribute, as_method
+from kodiak.transforms import (ComposerTransform, MethodTransform,
+                               PropertyTransform, default_transform)
+
+values = ['a', '.a', 'a!', '1', '.1', '.1e5', '', '.', '!', '..a', 'a.b', '.a.b', 'a!!']
+ambiguous = ['1!', '.a!', '.1!', '..5']
+
+sequential = ComposerTransform([PropertyTransform(), MethodTransform()])
+sequential.compiled = False
+
+
+def outcome(transform, value):
+    try:
+        return transform.transform(Match(value))
+    except ValueError as e:
+        return type(e)
+
+
+class TestComposerTransform(object):
+    def test_compiled(self):
+        assert default_transform.compiled
+
+        for value in values + ambiguous:
+            assert outcome(default_transform, value) == outcome(sequential, value), value
+
+        assert default_transform.transform(Match('.a')).payload == {'default_colbuilder': as_attribute}
+        assert default_transform.transform(Match('a!')).payload == {'default_colbuilder': as_method}
+
+    def test_ambiguous(self):
+        for value in ambiguous:
+            with pytest.raises(ValueError, match="ambiguous"):
+                default_transform.transform(Match(value))
+
+    def test_transform_group(self):
+        _, (group, ) = ArgsParser().parse("x_{.a,.b,c!,d,0:9}")
+        transformed = default_transform.transform_group(group)
+
+        assert transformed == [default_transform.transform(match) for match in group]
+        assert isinstance(transformed, MatchChain)
+        assert [len(g) for g in transformed.groups] == [2, 1, 1, 10]
+        assert transformed.groups[0].values == ['a', 'b']
+
+        numbers = MatchGroup(range(10))
+        assert default_transform.transform_group(numbers) is numbers